@@ -94,4 +94,12 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
 # Add these at the bottom
 LOGIN_REDIRECT_URL = 'dashboard'  # Where to redirect after login
-LOGOUT_REDIRECT_URL = 'login'     # Where to redirect after logout
\ No newline at end of file
+LOGOUT_REDIRECT_URL = 'login'     # Where to redirect after logout
+
+# Admission control for heavy endpoints, enforced per server process.
+# Each entry overrides the defaults in inventory/ml_engine/admission.py.
+ADMISSION_CONTROL = {
+    'train': {'global_concurrency': 2, 'business_concurrency': 1, 'rate_per_minute': 2, 'burst': 2},
+    'upload': {'global_concurrency': 4, 'business_concurrency': 2, 'rate_per_minute': 10, 'burst': 5},
+    'report': {'global_concurrency': 4, 'business_concurrency': 1, 'rate_per_minute': 6, 'burst': 3},
+}
\ No newline at end of file
@@ -1,10 +1,15 @@
 # inventory/admin.py
 from django.contrib import admin
-from .models import Business, Dataset, MLModel, Notification, Report, Prediction
+from .models import Business, Dataset, Explanation, MLModel, ModelDriftState, ModelEvaluation, Notification, ProductClass, ProductSalesState, Report, Prediction
 
 admin.site.register(Business)
 admin.site.register(Dataset)
 admin.site.register(MLModel)
+admin.site.register(ModelEvaluation)
+admin.site.register(Explanation)
+admin.site.register(ModelDriftState)
 admin.site.register(Notification)
+admin.site.register(ProductSalesState)
+admin.site.register(ProductClass)
 admin.site.register(Report)
 admin.site.register(Prediction)
\ No newline at end of file
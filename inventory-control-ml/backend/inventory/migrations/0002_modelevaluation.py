@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelEvaluation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=50)),
+                ('cv_strategy', models.CharField(max_length=50)),
+                ('n_splits', models.IntegerField()),
+                ('fold_scores', models.JSONField(default=dict)),
+                ('mean_score', models.FloatField()),
+                ('std_score', models.FloatField()),
+                ('fit_time_ms', models.FloatField()),
+                ('predict_latency_ms', models.FloatField()),
+                ('model_size_bytes', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('ml_model', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='evaluation', to='inventory.mlmodel')),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_modelevaluation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mlmodel',
+            name='serving_file',
+            field=models.FileField(blank=True, null=True, upload_to='models/'),
+        ),
+        migrations.AddField(
+            model_name='modelevaluation',
+            name='serving_kind',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='modelevaluation',
+            name='serving_latency_ms',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_serving_artifact'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Explanation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('input_hash', models.CharField(max_length=64)),
+                ('status', models.CharField(default='pending', max_length=20)),
+                ('values', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('ml_model', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='inventory.mlmodel')),
+            ],
+            options={
+                'unique_together': {('ml_model', 'input_hash')},
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_explanation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='canonical',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='inventory.dataset'),
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
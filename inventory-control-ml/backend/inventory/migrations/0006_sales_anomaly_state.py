@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_dataset_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='dedup_key',
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name='notification',
+            unique_together={('business', 'dedup_key')},
+        ),
+        migrations.CreateModel(
+            name='ProductSalesState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_name', models.CharField(max_length=200)),
+                ('count', models.IntegerField(default=0)),
+                ('mean', models.FloatField(default=0)),
+                ('m2', models.FloatField(default=0)),
+                ('ewma', models.FloatField(default=0)),
+                ('ewm_abs_dev', models.FloatField(default=0)),
+                ('last_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='inventory.business')),
+            ],
+            options={
+                'unique_together': {('business', 'product_name')},
+            },
+        ),
+    ]
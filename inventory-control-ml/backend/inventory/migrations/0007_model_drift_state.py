@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_sales_anomaly_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelDriftState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('baseline', models.JSONField(default=list)),
+                ('baseline_total', models.IntegerField(default=0)),
+                ('window', models.JSONField(default=list)),
+                ('window_total', models.IntegerField(default=0)),
+                ('checks', models.IntegerField(default=0)),
+                ('last_report', models.JSONField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('ml_model', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='drift_state', to='inventory.mlmodel')),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_model_drift_state'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['business', 'is_read'], name='inventory_n_busines_117f5b_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_notification_read_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductClass',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_name', models.CharField(max_length=200)),
+                ('revenue', models.FloatField(default=0)),
+                ('quantity', models.FloatField(default=0)),
+                ('weeks', models.IntegerField(default=0)),
+                ('weekly_sumsq', models.FloatField(default=0)),
+                ('abc_class', models.CharField(max_length=1)),
+                ('xyz_class', models.CharField(max_length=1)),
+                ('dataset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_classes', to='inventory.dataset')),
+            ],
+            options={
+                'unique_together': {('dataset', 'product_name')},
+            },
+        ),
+    ]
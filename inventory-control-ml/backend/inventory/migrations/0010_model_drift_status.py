@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_product_class'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='modeldriftstate',
+            name='status',
+            field=models.CharField(default='ready', max_length=20),
+        ),
+    ]
@@ -1,6 +1,35 @@
+from .admission import AdmissionController
+from .anomaly import SalesAnomalyDetector
 from .automl import AutoMLEngine
+from .classification import ProductClassifier
+from .columnar_cache import ColumnarCache
 from .data_processor import DataProcessor
+from .dataset_table import BusinessDatasetTable
+from .drift import DriftMonitor
+from .evaluation import ModelEvaluator
+from .explanations import ExplanationEngine
+from .model_export import ModelExporter
 from .notifications import NotificationEngine
 from .report_generator import ReportGenerator
+from .seasonality import SeasonalityAnalyzer
+from .simulation import StockoutSimulator
+from .stock_status import StockStatusAnalyzer
 
-__all__ = ['AutoMLEngine', 'DataProcessor', 'NotificationEngine', 'ReportGenerator']
\ No newline at end of file
+__all__ = [
+    'AdmissionController',
+    'AutoMLEngine',
+    'BusinessDatasetTable',
+    'ColumnarCache',
+    'DataProcessor',
+    'DriftMonitor',
+    'ExplanationEngine',
+    'ModelEvaluator',
+    'ModelExporter',
+    'NotificationEngine',
+    'ProductClassifier',
+    'ReportGenerator',
+    'SalesAnomalyDetector',
+    'SeasonalityAnalyzer',
+    'StockoutSimulator',
+    'StockStatusAnalyzer',
+]
\ No newline at end of file
@@ -0,0 +1,238 @@
+from django.conf import settings
+from django.http import JsonResponse
+from django.shortcuts import render
+from django.utils.http import url_has_allowed_host_and_scheme
+from functools import wraps
+from ..models import Business
+import math
+import threading
+import time
+
+DEFAULT_LIMITS = {
+    'global_concurrency': 4,
+    'business_concurrency': 1,
+    'rate_per_minute': 6,
+    'burst': 3,
+    # Global bucket; None scales the per-business rate and burst by global_concurrency
+    'global_rate_per_minute': None,
+    'global_burst': None,
+    'max_queue': 8,
+    # Waiters per business; None allows as many as business_concurrency
+    'business_max_queue': None,
+    'queue_timeout': 5,
+    'expected_seconds': 10,
+}
+DEFAULT_ENDPOINTS = {
+    'train': {'global_concurrency': 2, 'rate_per_minute': 2, 'burst': 2, 'expected_seconds': 120},
+    'upload': {'business_concurrency': 2, 'rate_per_minute': 10, 'burst': 5},
+    'report': {'rate_per_minute': 6, 'burst': 3},
+    'simulate': {'business_concurrency': 2, 'rate_per_minute': 20, 'burst': 5},
+    'explain': {'business_concurrency': 2, 'rate_per_minute': 30, 'burst': 10, 'queue_timeout': 0},
+}
+SERVICE_TIME_ALPHA = 0.2
+
+class TokenBucket:
+    def __init__(self, rate_per_minute, burst):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def refund(self):
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    def wait_time(self):
+        """Seconds until a token is available; zero when one is available now"""
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate if self.rate > 0 else math.inf
+
+class Rejected(Exception):
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+class AdmissionController:
+    """In-process admission control for one class of heavy requests.
+
+    Requests take a token from both the business's and the global bucket,
+    then wait in a bounded queue for a global and per-business concurrency
+    slot. Each business may only hold a few places in the queue, and tokens
+    of requests rejected while queueing are refunded. Limits hold per server
+    process.
+    """
+
+    def __init__(self, name, global_concurrency, business_concurrency, rate_per_minute, burst,
+                 global_rate_per_minute, global_burst, max_queue, business_max_queue, queue_timeout,
+                 expected_seconds):
+        self.name = name
+        self.global_concurrency = global_concurrency
+        self.business_concurrency = business_concurrency
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.max_queue = max_queue
+        self.business_max_queue = business_concurrency if business_max_queue is None else business_max_queue
+        self.queue_timeout = queue_timeout
+        self.service_seconds = float(expected_seconds)
+
+        self._condition = threading.Condition()
+        self._global_bucket = TokenBucket(
+            rate_per_minute * global_concurrency if global_rate_per_minute is None else global_rate_per_minute,
+            burst * global_concurrency if global_burst is None else global_burst
+        )
+        self._buckets = {}
+        self._running = {}
+        self._queued = 0
+        self._queued_by = {}
+        self._admitted = 0
+        self._rejected = {'rate_limited': 0, 'queue_full': 0, 'timed_out': 0}
+
+    @property
+    def in_flight(self):
+        return sum(self._running.values())
+
+    def _take_token(self, business_key):
+        now = time.monotonic()
+        bucket = self._buckets.get(business_key)
+        if bucket is None:
+            bucket = self._buckets[business_key] = TokenBucket(self.rate_per_minute, self.burst)
+        bucket.refill(now)
+        self._global_bucket.refill(now)
+
+        wait = max(bucket.wait_time(), self._global_bucket.wait_time())
+        if wait > 0:
+            self._rejected['rate_limited'] += 1
+            raise Rejected('rate_limited', wait)
+        bucket.tokens -= 1
+        self._global_bucket.tokens -= 1
+
+    def _refund_token(self, business_key):
+        # Rejected after the rate check: the request never ran, so it keeps its budget
+        self._buckets[business_key].refund()
+        self._global_bucket.refund()
+
+    def _has_slot(self, business_key):
+        return (self.in_flight < self.global_concurrency
+                and self._running.get(business_key, 0) < self.business_concurrency)
+
+    def acquire(self, business_key):
+        """Admit a request or raise Rejected with a Retry-After estimate"""
+        with self._condition:
+            self._take_token(business_key)
+
+            if not self._has_slot(business_key):
+                if self._queued >= self.max_queue or self._queued_by.get(business_key, 0) >= self.business_max_queue:
+                    self._rejected['queue_full'] += 1
+                    self._refund_token(business_key)
+                    raise Rejected('queue_full', self._estimated_wait())
+                self._queued += 1
+                self._queued_by[business_key] = self._queued_by.get(business_key, 0) + 1
+                try:
+                    admitted = self._condition.wait_for(lambda: self._has_slot(business_key), self.queue_timeout)
+                finally:
+                    self._queued -= 1
+                    self._queued_by[business_key] -= 1
+                    if not self._queued_by[business_key]:
+                        del self._queued_by[business_key]
+                if not admitted:
+                    self._rejected['timed_out'] += 1
+                    self._refund_token(business_key)
+                    raise Rejected('timed_out', self._estimated_wait())
+
+            self._running[business_key] = self._running.get(business_key, 0) + 1
+            self._admitted += 1
+            return time.monotonic()
+
+    def release(self, business_key, started):
+        with self._condition:
+            self._running[business_key] -= 1
+            if not self._running[business_key]:
+                del self._running[business_key]
+            elapsed = time.monotonic() - started
+            self.service_seconds += SERVICE_TIME_ALPHA * (elapsed - self.service_seconds)
+            self._condition.notify_all()
+
+    def _estimated_wait(self):
+        # Requests ahead of this one drain in batches of the global concurrency
+        return self.service_seconds * (1 + self._queued // max(self.global_concurrency, 1))
+
+    def metrics(self, business_key=None):
+        with self._condition:
+            metrics = {
+                'in_flight': self.in_flight,
+                'queue_depth': self._queued,
+                'global_concurrency': self.global_concurrency,
+                'business_concurrency': self.business_concurrency,
+                'admitted': self._admitted,
+                'rejected': dict(self._rejected),
+                'avg_service_seconds': round(self.service_seconds, 3),
+            }
+            if business_key is not None:
+                metrics['business_in_flight'] = self._running.get(business_key, 0)
+                metrics['business_queue_depth'] = self._queued_by.get(business_key, 0)
+                bucket = self._buckets.get(business_key)
+                if bucket is not None:
+                    bucket.refill(time.monotonic())
+                metrics['business_tokens'] = round(bucket.tokens if bucket else float(self.burst), 2)
+            return metrics
+
+_lock = threading.Lock()
+_controllers = {}
+
+def controller(name):
+    """Shared controller for an endpoint class, configured from settings.ADMISSION_CONTROL"""
+    with _lock:
+        if name not in _controllers:
+            configured = getattr(settings, 'ADMISSION_CONTROL', {})
+            limits = {**DEFAULT_LIMITS, **DEFAULT_ENDPOINTS.get(name, {}), **configured.get(name, {})}
+            _controllers[name] = AdmissionController(name, **limits)
+        return _controllers[name]
+
+def metrics(business_key=None):
+    return {name: controller(name).metrics(business_key) for name in DEFAULT_ENDPOINTS}
+
+def business_key(request):
+    business = Business.objects.filter(user=request.user).order_by('-created_at').first()
+    return f"business:{business.id}" if business else f"user:{request.user.id}"
+
+def admission_control(name):
+    """Shed load for a heavy view with 429 and Retry-After once its limits are reached"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key = business_key(request)
+            admission = controller(name)
+            try:
+                started = admission.acquire(key)
+            except Rejected as rejected:
+                response = _rejection(request, rejected)
+                response['Retry-After'] = str(rejected.retry_after)
+                return response
+
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                admission.release(key, started)
+        return wrapper
+    return decorator
+
+def _rejection(request, rejected):
+    message = (f"The server is busy with other requests ({rejected.reason.replace('_', ' ')}). "
+               f"Please try again in {rejected.retry_after} seconds")
+    if request.path.startswith('/api/') or 'application/json' in request.headers.get('Accept', ''):
+        return JsonResponse({
+            'status': 'error',
+            'message': message,
+            'retry_after': rejected.retry_after
+        }, status=429)
+    back_url = request.headers.get('Referer', '')
+    if not url_has_allowed_host_and_scheme(back_url, allowed_hosts={request.get_host()}):
+        back_url = '/dashboard'
+    return render(request, 'too_many_requests.html', {
+        'message': message,
+        'retry_after': rejected.retry_after,
+        'back_url': back_url
+    }, status=429)
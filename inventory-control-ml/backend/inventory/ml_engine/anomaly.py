@@ -0,0 +1,129 @@
+from ..models import Notification, ProductSalesState
+from .notification_feed import NotificationFeed
+import numpy as np
+import pandas as pd
+
+EWMA_ALPHA = 0.3
+SCALE_ALPHA = 0.05  # slow decay so the scale spans a few weeks, not the last handful of days
+Z_THRESHOLD = 3.5
+ENTRY_ERROR_Z = 10.0
+WARMUP_DAYS = 21
+MAD_TO_SIGMA = 1.2533
+
+class SalesAnomalyDetector:
+    """Streaming sales outlier detection with constant-size state per product.
+
+    Daily totals newer than a product's last processed day are replayed in
+    date order, all products at once per day. Each point is scored against
+    the stored EWMA, scaled by the slowly decaying EW mean absolute deviation
+    floored at the running standard deviation, before the running
+    mean/variance and EWMA state are updated.
+    """
+
+    def __init__(self, business):
+        self.business = business
+
+    def process(self, df):
+        if not all(col in df.columns for col in ['date', 'product_name', 'sales_quantity']):
+            return []
+
+        dates = pd.to_datetime(df['date'], errors='coerce')
+        quantity = pd.to_numeric(df['sales_quantity'], errors='coerce')
+        valid = dates.notna() & quantity.notna() & df['product_name'].notna()
+        notifications = []
+
+        invalid = int((~valid).sum())
+        if invalid:
+            notifications.append(self._notification(
+                f"{invalid} sales rows have an unreadable date, product or quantity and were skipped"
+            ))
+
+        daily = pd.DataFrame({
+            'product_name': df['product_name'][valid].astype(str),
+            'day': dates[valid].dt.normalize(),
+            'quantity': quantity[valid].astype(float)
+        }).groupby(['product_name', 'day'], as_index=False)['quantity'].sum().sort_values('day', kind='stable')
+
+        products = sorted(daily['product_name'].unique())
+        existing = {
+            state.product_name: state
+            for state in ProductSalesState.objects.filter(business=self.business, product_name__in=products)
+        }
+        states = [
+            existing.get(name) or ProductSalesState(business=self.business, product_name=name)
+            for name in products
+        ]
+
+        count = np.array([state.count for state in states], dtype=float)
+        mean = np.array([state.mean for state in states], dtype=float)
+        m2 = np.array([state.m2 for state in states], dtype=float)
+        ewma = np.array([state.ewma for state in states], dtype=float)
+        ewm_abs_dev = np.array([state.ewm_abs_dev for state in states], dtype=float)
+        last_day = np.array([np.datetime64(state.last_date) if state.last_date else np.datetime64('NaT')
+                             for state in states], dtype='datetime64[ns]')
+
+        # Only rows after each product's last processed day are new
+        codes = pd.Index(products).get_indexer(daily['product_name'])
+        days = daily['day'].to_numpy(dtype='datetime64[ns]')
+        values = daily['quantity'].to_numpy()
+        fresh = np.isnat(last_day[codes]) | (days > last_day[codes])
+        codes, days, values = codes[fresh], days[fresh], values[fresh]
+
+        boundaries = np.flatnonzero(np.diff(days.astype('int64'))) + 1
+        for block in np.split(np.arange(len(days)), boundaries):
+            if not len(block):
+                continue
+            p, x, day = codes[block], values[block], days[block[0]]
+
+            # Robust scale from the EW absolute deviation, never below the running std
+            scale = np.maximum(ewm_abs_dev[p] * MAD_TO_SIGMA, np.sqrt(m2[p] / np.maximum(count[p] - 1, 1)))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                z = np.where(scale > 0, (x - ewma[p]) / scale, 0.0)
+            warmed = count[p] >= WARMUP_DAYS
+            for i in np.flatnonzero((warmed & (np.abs(z) > Z_THRESHOLD)) | (x < 0)):
+                notifications.append(self._anomaly(products[p[i]], day, x[i], ewma[p[i]], z[i]))
+
+            # Welford running mean/variance, then EWMA and EW absolute deviation
+            count[p] += 1
+            delta = x - mean[p]
+            mean[p] += delta / count[p]
+            m2[p] += delta * (x - mean[p])
+            first = count[p] == 1
+            deviation = np.abs(x - ewma[p])
+            ewm_abs_dev[p] = np.where(first, 0.0, (1 - SCALE_ALPHA) * ewm_abs_dev[p] + SCALE_ALPHA * deviation)
+            ewma[p] = np.where(first, x, (1 - EWMA_ALPHA) * ewma[p] + EWMA_ALPHA * x)
+            last_day[p] = day
+
+        for i, state in enumerate(states):
+            state.count, state.mean, state.m2 = int(count[i]), float(mean[i]), float(m2[i])
+            state.ewma, state.ewm_abs_dev = float(ewma[i]), float(ewm_abs_dev[i])
+            state.last_date = None if np.isnat(last_day[i]) else pd.Timestamp(last_day[i]).date()
+
+        fields = ['count', 'mean', 'm2', 'ewma', 'ewm_abs_dev', 'last_date']
+        ProductSalesState.objects.bulk_update([state for state in states if state.pk], fields)
+        ProductSalesState.objects.bulk_create([state for state in states if not state.pk])
+        Notification.objects.bulk_create(notifications, ignore_conflicts=True)
+        if notifications:
+            NotificationFeed(self.business).publish()
+        return notifications
+
+    def _anomaly(self, product, day, value, expected, z):
+        day = pd.Timestamp(day).date()
+        if value < 0:
+            kind = "negative sales quantity (possible data-entry error)"
+        elif abs(z) > ENTRY_ERROR_Z:
+            kind = "extreme outlier (possible data-entry error)"
+        else:
+            kind = "sales spike" if z > 0 else "sales drop"
+        return self._notification(
+            f"Sales anomaly for {product} on {day}: {kind}. Sold {value:g}, expected around {expected:.1f}",
+            f"sales_anomaly:{product}:{day}"
+        )
+
+    def _notification(self, message, dedup_key=None):
+        return Notification(
+            business=self.business,
+            message=message,
+            notification_type='sales_anomaly',
+            dedup_key=dedup_key[:200] if dedup_key else None
+        )
@@ -1,49 +1,98 @@
 import pandas as pd
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, mean_absolute_error
 from tpot import TPOTClassifier, TPOTRegressor
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from django.conf import settings
+from functools import lru_cache
+from .evaluation import ModelEvaluator
+from .model_export import ModelExporter
 import joblib
 import os
-import tempfile
+import uuid
+
+RANDOM_STATE = 42
+
+@lru_cache(maxsize=32)
+def _load_model(model_path, modified):
+    return joblib.load(model_path)
+
+def load_model(model_path):
+    """Deserialize a model once per process; a rewritten file is reloaded"""
+    return _load_model(model_path, os.path.getmtime(model_path))
 
 class AutoMLEngine:
     def __init__(self, dataset_path):
         self.dataset_path = dataset_path
-        self.df = pd.read_csv(dataset_path)
+        self._df = None
+
+    @property
+    def df(self):
+        if self._df is None:
+            self._df = pd.read_csv(self.dataset_path)
+        return self._df
         
-    def train(self):
+    def split(self):
+        """80/20 train/test split, time ordered when the dataset is dated"""
         if 'target' not in self.df.columns:
             raise ValueError("Dataset must contain 'target' column")
-            
-        X = self.df.drop('target', axis=1)
-        y = self.df['target']
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2)
+
+        # Dated rows are kept in time order so evaluation never trains on the future
+        df = self.df
+        self.time_ordered = 'date' in df.columns
+        if self.time_ordered:
+            order = pd.to_datetime(df['date'], errors='coerce').argsort(kind='stable')
+            df = df.iloc[order].reset_index(drop=True)
+
+        X = df.drop('target', axis=1)
+        y = df['target']
+        if self.time_ordered:
+            split = int(len(df) * 0.8)
+            X_train, X_test, y_train, y_test = X.iloc[:split], X.iloc[split:], y.iloc[:split], y.iloc[split:]
+        else:
+            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=RANDOM_STATE)
+        self.X, self.y = X, y
+        self.X_train, self.X_test, self.y_train, self.y_test = X_train, X_test, y_train, y_test
+        return X_train, X_test, y_train, y_test
+        
+    def train(self):
+        X_train, X_test, y_train, y_test = self.split()
+        X, y = self.X, self.y
         
         # Determine problem type
         if y.dtype == 'object':
             problem_type = 'classification'
-            model = TPOTClassifier(generations=3, population_size=10, verbosity=2)
-            metric = accuracy_score
+            model = TPOTClassifier(generations=3, population_size=10, verbosity=2, random_state=RANDOM_STATE)
         else:
             problem_type = 'regression'
-            model = TPOTRegressor(generations=3, population_size=10, verbosity=2)
-            metric = mean_absolute_error
+            model = TPOTRegressor(generations=3, population_size=10, verbosity=2, random_state=RANDOM_STATE)
         
         model.fit(X_train, y_train)
-        score = metric(y_test, model.predict(X_test))
+        evaluation = ModelEvaluator(problem_type, random_state=RANDOM_STATE).evaluate(
+            model.fitted_pipeline_, X, y, self.time_ordered
+        )
+        
+        export = ModelExporter(model.fitted_pipeline_, X.columns).export(X_test)
+        evaluation['serving_kind'] = export['kind']
+        evaluation['serving_latency_ms'] = export['latency_ms']
         
-        model_path = os.path.join(tempfile.gettempdir(), 'model.joblib')
-        joblib.dump(model.fitted_pipeline_, model_path)
+        name = uuid.uuid4().hex
+        model_file = f"models/{name}.joblib"
+        serving_file = f"models/{name}_serving.joblib"
+        os.makedirs(os.path.join(settings.MEDIA_ROOT, 'models'), exist_ok=True)
+        joblib.dump(model.fitted_pipeline_, os.path.join(settings.MEDIA_ROOT, model_file))
+        joblib.dump(export['model'], os.path.join(settings.MEDIA_ROOT, serving_file))
         
         return {
             'best_model_type': problem_type,
             'best_algorithm': str(model.fitted_pipeline_),
-            'best_accuracy': score,
-            'model_file': model_path
+            'best_accuracy': evaluation['mean_score'],
+            'metric': evaluation['metric'],
+            'evaluation': evaluation,
+            'model_file': model_file,
+            'serving_file': serving_file
         }
     
     def predict(self, model_path, input_data):
-        model = joblib.load(model_path)
+        model = load_model(model_path)
         input_df = pd.DataFrame([input_data])
         return model.predict(input_df).tolist()
\ No newline at end of file
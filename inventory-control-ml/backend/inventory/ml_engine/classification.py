@@ -0,0 +1,171 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+from ..models import ProductClass
+from .dataset_table import BusinessDatasetTable
+import numpy as np
+import pandas as pd
+
+ABC_THRESHOLDS = (0.8, 0.95)
+XYZ_THRESHOLDS = (0.5, 1.0)
+ABC_LABELS = ('A', 'B', 'C')
+XYZ_LABELS = ('X', 'Y', 'Z')
+REQUIRED_COLUMNS = ['date', 'product_name', 'sales_quantity']
+VALUE_COLUMNS = ['sales_amount', 'unit_price']
+STATISTICS = ['revenue', 'quantity', 'weeks', 'weekly_sumsq']
+CACHE_TIMEOUT = 60 * 60
+
+def abc_classes(revenue):
+    """Pareto classes: A up to 80% of revenue, B up to 95%, C for the tail"""
+    revenue = np.asarray(revenue, dtype=float)
+    order = np.argsort(-revenue, kind='stable')
+    total = revenue.sum()
+    share_before = np.zeros(len(revenue))
+    if total > 0:
+        share_before[order] = (np.cumsum(revenue[order]) - revenue[order]) / total
+    return np.select([share_before < ABC_THRESHOLDS[0], share_before < ABC_THRESHOLDS[1]], ABC_LABELS[:2], ABC_LABELS[2])
+
+def coefficient_of_variation(quantity, weeks, weekly_sumsq):
+    """CV of weekly demand from its sum, sum of squares and week count"""
+    weeks = np.maximum(np.asarray(weeks, dtype=float), 1)
+    mean = np.asarray(quantity, dtype=float) / weeks
+    variance = np.maximum(np.asarray(weekly_sumsq, dtype=float) / weeks - mean ** 2, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(mean > 0, np.sqrt(variance) / mean, np.inf)
+
+def xyz_classes(cv):
+    """Variability classes: X steady (CV <= 0.5), Y variable (<= 1.0), Z erratic"""
+    return np.select([cv <= XYZ_THRESHOLDS[0], cv <= XYZ_THRESHOLDS[1]], XYZ_LABELS[:2], XYZ_LABELS[2])
+
+class ProductClassifier:
+    """ABC (revenue contribution) and XYZ (weekly demand variability) product classes.
+
+    Sufficient statistics are stored per dataset partition, so an upload only
+    scans its own rows and those of older partitions it supersedes; the
+    business-wide classes are a grouped sum over the stored statistics.
+    """
+
+    def __init__(self, business):
+        self.business = business
+        self.table = BusinessDatasetTable(business)
+        self.cache_key = f"product_classes:{business.id}"
+
+    @staticmethod
+    def statistics(df):
+        """Per-product revenue, quantity and weekly demand moments"""
+        dates = pd.to_datetime(df['date'], errors='coerce')
+        quantity = pd.to_numeric(df['sales_quantity'], errors='coerce')
+        valid = (dates.notna() & quantity.notna() & df['product_name'].notna()).to_numpy()
+        if not valid.any():
+            return pd.DataFrame(columns=['product_name'] + STATISTICS)
+
+        # Revenue from recorded amounts, else quantity times price, else volume alone
+        if 'sales_amount' in df.columns:
+            value = pd.to_numeric(df['sales_amount'], errors='coerce').fillna(0)
+        elif 'unit_price' in df.columns:
+            value = quantity * pd.to_numeric(df['unit_price'], errors='coerce').fillna(0)
+        else:
+            value = quantity
+
+        codes, products = pd.factorize(pd.Series(df['product_name'][valid]).astype(str), sort=True)
+        quantity = quantity.to_numpy(dtype=float)[valid]
+        # Weeks run Monday to Sunday; the epoch fell on a Thursday
+        week = (dates[valid].to_numpy().astype('datetime64[D]').astype(np.int64) + 3) // 7
+        week = week - week.min()
+        n_weeks = int(week.max()) + 1
+
+        weekly = np.bincount(codes * n_weeks + week, weights=quantity, minlength=len(products) * n_weeks)
+        first_week = np.full(len(products), n_weeks)
+        np.minimum.at(first_week, codes, week)
+
+        return pd.DataFrame({
+            'product_name': np.asarray(products),
+            'revenue': np.bincount(codes, weights=value.to_numpy(dtype=float)[valid], minlength=len(products)),
+            'quantity': np.bincount(codes, weights=quantity, minlength=len(products)),
+            # Zero-sale weeks count from a product's first sale to the end of the partition
+            'weeks': n_weeks - first_week,
+            'weekly_sumsq': (weekly.reshape(len(products), n_weeks) ** 2).sum(axis=1),
+        })
+
+    @staticmethod
+    def classify(stats):
+        """Add revenue share, CV and ABC/XYZ classes to per-product statistics"""
+        stats = stats.reset_index(drop=True)
+        total = stats['revenue'].sum()
+        stats['revenue_share'] = stats['revenue'] / total if total > 0 else 0.0
+        stats['cv'] = coefficient_of_variation(stats['quantity'], stats['weeks'], stats['weekly_sumsq'])
+        stats['abc_class'] = abc_classes(stats['revenue'])
+        stats['xyz_class'] = xyz_classes(stats['cv'].to_numpy())
+        stats['product_class'] = stats['abc_class'] + stats['xyz_class']
+        return stats
+
+    def _affected(self, dataset):
+        """A new partition and the older partitions it supersedes rows of"""
+        partitions = self.table.partitions()
+        target = next((cache for cache in partitions if cache.dataset.id == dataset.id), None)
+        if target is None:
+            return set()
+
+        return {dataset.id} | {
+            cache.dataset.id for cache in partitions[partitions.index(target) + 1:]
+            if self.table.supersedes(target, cache)
+        }
+
+    def refresh(self, dataset=None):
+        """Recompute stored statistics after an upload, or for every partition"""
+        dataset_ids = self._affected(dataset) if dataset is not None else None
+        frames = self.table.partition_frames(REQUIRED_COLUMNS, dataset_ids, optional=VALUE_COLUMNS)
+
+        rows = []
+        for dataset_id, frame in frames.items():
+            stats = self.statistics(frame)
+            if stats.empty:
+                continue
+            stats = self.classify(stats)
+            rows.extend(
+                ProductClass(dataset_id=dataset_id, **record)
+                for record in stats[['product_name'] + STATISTICS + ['abc_class', 'xyz_class']].to_dict('records')
+            )
+
+        with transaction.atomic():
+            stale = ProductClass.objects.filter(dataset__business=self.business)
+            if dataset_ids is not None:
+                stale = stale.filter(dataset_id__in=dataset_ids)
+            stale.delete()
+            ProductClass.objects.bulk_create(rows, batch_size=1000)
+        cache.delete(self.cache_key)
+        return len(rows)
+
+    def classes(self):
+        """Business-wide classes merged from every partition's statistics"""
+        classes = cache.get(self.cache_key)
+        if classes is None:
+            stored = ProductClass.objects.filter(dataset__business=self.business, dataset__canonical__isnull=True)
+            if not stored.exists():
+                self.refresh()
+            stats = pd.DataFrame.from_records(
+                stored.values('product_name').annotate(**{field: Sum(field) for field in STATISTICS}),
+                columns=['product_name'] + STATISTICS
+            )
+            classes = self.classify(stats).sort_values('revenue', ascending=False, ignore_index=True)
+            cache.set(self.cache_key, classes, CACHE_TIMEOUT)
+        return classes
+
+    def products(self, abc=None, xyz=None):
+        """Names of products in the given ABC and/or XYZ classes"""
+        classes = self.classes()
+        mask = np.ones(len(classes), dtype=bool)
+        if abc:
+            mask &= classes['abc_class'].isin(list(abc)).to_numpy()
+        if xyz:
+            mask &= classes['xyz_class'].isin(list(xyz)).to_numpy()
+        return classes['product_name'][mask].tolist()
+
+    @staticmethod
+    def annotate(df, classes, by='product_name'):
+        """Attach class columns to any frame keyed by product name"""
+        lookup = classes.set_index('product_name')
+        df = df.copy()
+        for col in ['abc_class', 'xyz_class']:
+            df[col] = df[by].astype(str).map(lookup[col]).fillna('-').to_numpy()
+        return df
@@ -0,0 +1,122 @@
+from django.conf import settings
+import numpy as np
+import pandas as pd
+import json
+import os
+import shutil
+import tempfile
+
+from .data_processor import DataProcessor
+
+CACHE_ROOT = os.path.join(settings.MEDIA_ROOT, 'cache', 'datasets')
+MANIFEST = 'manifest.json'
+FORMAT_VERSION = 2  # bumped when the column encoding changes, so older caches are rebuilt
+
+class ColumnarCache:
+    """Per-dataset column store: one .npy file per column plus a JSON manifest"""
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.path = os.path.join(CACHE_ROOT, f"v{FORMAT_VERSION}", self.key)
+        self._manifest = None
+
+    @property
+    def key(self):
+        return self.dataset.artifact_key
+
+    def exists(self):
+        return os.path.exists(os.path.join(self.path, MANIFEST))
+
+    def ensure(self, df=None):
+        if not self.exists():
+            self.build(df)
+        return self
+
+    @property
+    def manifest(self):
+        if self._manifest is None:
+            with open(os.path.join(self.ensure().path, MANIFEST)) as f:
+                self._manifest = json.load(f)
+        return self._manifest
+
+    @property
+    def columns(self):
+        return list(self.manifest['columns'])
+
+    def build(self, df=None):
+        """Write every column of the dataset to its own array file"""
+        if df is None:
+            df = DataProcessor(self.dataset.file.path).load_data(only_preview=True)
+        df = df.copy()
+        df.columns = [col.lower() for col in df.columns]
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        staging = tempfile.mkdtemp(dir=os.path.dirname(self.path))
+        manifest = {'row_count': len(df), 'columns': {}, 'date_min': None, 'date_max': None}
+
+        for position, col in enumerate(df.columns):
+            values, meta = self._encode(col, df[col])
+            meta['file'] = f"{position}.npy"
+            np.save(os.path.join(staging, meta['file']), values)
+            manifest['columns'][col] = meta
+
+            if col == 'date' and meta['kind'] == 'datetime':
+                dates = values[~np.isnat(values)]
+                if len(dates):
+                    manifest['date_min'] = str(dates.min())
+                    manifest['date_max'] = str(dates.max())
+
+        with open(os.path.join(staging, MANIFEST), 'w') as f:
+            json.dump(manifest, f)
+
+        # Swap the finished directory in so readers never see a partial cache
+        try:
+            os.rename(staging, self.path)
+        except OSError:
+            if self.exists():
+                # A concurrent build of the same content finished first; keep its files
+                shutil.rmtree(staging, ignore_errors=True)
+            else:
+                shutil.rmtree(self.path, ignore_errors=True)
+                os.rename(staging, self.path)
+        self._manifest = manifest
+        return self
+
+    @staticmethod
+    def _encode(col, series):
+        if col == 'date':
+            return pd.to_datetime(series, errors='coerce').to_numpy(dtype='datetime64[ns]'), {'kind': 'datetime'}
+        if col == 'product_name':
+            # Names are always labels, so numeric SKUs filter and match as strings;
+            # whole-number floats (SKUs read alongside blanks) keep their integer form
+            if pd.api.types.is_float_dtype(series) and (series.dropna() % 1 == 0).all():
+                series = series.astype('Int64')
+        elif pd.api.types.is_numeric_dtype(series):
+            return series.to_numpy(), {'kind': 'numeric'}
+
+        categorical = pd.Categorical(series.astype('string'))
+        return categorical.codes.astype(np.int32), {
+            'kind': 'category',
+            'categories': categorical.categories.astype(str).tolist()
+        }
+
+    def read_array(self, col, decode=True):
+        """Memory-mapped column; categories are decoded unless asked for raw codes"""
+        meta = self.manifest['columns'][col]
+        values = np.load(os.path.join(self.ensure().path, meta['file']), mmap_mode='r')
+        if decode and meta['kind'] == 'category':
+            return pd.Categorical.from_codes(values, meta['categories'])
+        return values
+
+    def codes_for(self, col, labels):
+        """Codes of the given category labels present in this partition"""
+        categories = self.manifest['columns'][col].get('categories', [])
+        return np.flatnonzero(np.isin(categories, [str(label) for label in labels]))
+
+    def read(self, columns=None):
+        """Load only the requested columns into a dataframe"""
+        columns = [col for col in (columns or self.columns) if col in self.manifest['columns']]
+        return pd.DataFrame({col: self.read_array(col) for col in columns})
+
+    def delete(self):
+        shutil.rmtree(self.path, ignore_errors=True)
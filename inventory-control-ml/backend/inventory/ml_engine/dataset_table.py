@@ -0,0 +1,183 @@
+from concurrent.futures import ThreadPoolExecutor
+from ..models import Dataset
+from .columnar_cache import ColumnarCache
+import numpy as np
+import pandas as pd
+
+class BusinessDatasetTable:
+    """All of a business's uploads queried as one table, partitioned by dataset.
+
+    Uploads are often overlapping exports, so a newer partition supersedes
+    an older one's rows for the products it contains within its date span;
+    per-store or per-category exports covering the same dates are kept.
+    """
+
+    def __init__(self, business, max_workers=4):
+        self.business = business
+        self.max_workers = max_workers
+        self._partitions = None
+
+    def partitions(self):
+        """Column caches for every dataset, newest first"""
+        if self._partitions is None:
+            # Identical re-uploads reference their original and would double count
+            datasets = Dataset.objects.filter(business=self.business, canonical__isnull=True)
+            datasets = datasets.order_by('-uploaded_at')
+            self._partitions = [ColumnarCache(dataset).ensure() for dataset in datasets]
+        return self._partitions
+
+    def _plan(self, columns, start, end, products):
+        """Prune partitions by zone map and attach the spans superseding them"""
+        start = np.datetime64(pd.Timestamp(start), 'ns') if start is not None else None
+        end = np.datetime64(pd.Timestamp(end), 'ns') if end is not None else None
+
+        plan, newer_spans = [], []
+        for cache in self.partitions():
+            manifest = cache.manifest
+            if not all(col in manifest['columns'] for col in columns):
+                continue
+
+            lo = np.datetime64(manifest['date_min'], 'ns') if manifest['date_min'] else None
+            hi = np.datetime64(manifest['date_max'], 'ns') if manifest['date_max'] else None
+            spans = list(newer_spans)
+            if lo is not None:
+                newer_spans.append((lo, hi, self.product_keys(cache)))
+
+            if (start is not None or end is not None) and lo is None:
+                continue
+            if (start is not None and hi < start) or (end is not None and lo > end):
+                continue
+            if products is not None and 'product_name' in manifest['columns'] \
+                    and not len(cache.codes_for('product_name', products)):
+                continue
+
+            plan.append((cache, spans))
+        return plan, start, end
+
+    @staticmethod
+    def product_keys(cache):
+        """Distinct product names of a partition, or None when it has no product column"""
+        meta = cache.manifest['columns'].get('product_name')
+        return None if meta is None else list(meta['categories'])
+
+    def _covered_rows(self, cache, newer_products):
+        """Rows whose product a newer partition also holds; None when nothing is covered.
+
+        Partitions without a product column only supersede each other by date.
+        """
+        own_products = 'product_name' in cache.manifest['columns']
+        if newer_products is None or not own_products:
+            return np.True_ if newer_products is None and not own_products else None
+
+        covered = np.isin(cache.manifest['columns']['product_name']['categories'], newer_products)
+        if not covered.any():
+            return None
+        # Missing names are stored as code -1, which lands on the appended False
+        return np.append(covered, False)[cache.read_array('product_name', decode=False)]
+
+    def supersedes(self, newer, older):
+        """Whether a newer partition replaces any rows of an older one"""
+        newer_manifest, older_manifest = newer.manifest, older.manifest
+        if not (newer_manifest['date_min'] and older_manifest['date_min']):
+            return False
+        if newer_manifest['date_min'] > older_manifest['date_max'] \
+                or newer_manifest['date_max'] < older_manifest['date_min']:
+            return False
+        newer_products = self.product_keys(newer)
+        older_products = self.product_keys(older)
+        if newer_products is None or older_products is None:
+            return newer_products is None and older_products is None
+        return bool(np.isin(older_products, newer_products).any())
+
+    def _scan_partition(self, cache, spans, columns, start, end, products):
+        mask = np.ones(cache.manifest['row_count'], dtype=bool)
+
+        if 'date' in cache.manifest['columns'] and cache.manifest['columns']['date']['kind'] == 'datetime':
+            dates = cache.read_array('date')
+            if start is not None:
+                mask &= dates >= start
+            if end is not None:
+                mask &= dates <= end
+            for lo, hi, newer_products in spans:
+                covered = self._covered_rows(cache, newer_products)
+                if covered is not None:
+                    mask &= ~((dates >= lo) & (dates <= hi) & covered)
+
+        if products is not None and 'product_name' in cache.manifest['columns']:
+            codes = cache.read_array('product_name', decode=False)
+            mask &= np.isin(codes, cache.codes_for('product_name', products))
+
+        rows = np.flatnonzero(mask)
+        frame = pd.DataFrame({col: cache.read_array(col)[rows] for col in columns})
+        frame['dataset_id'] = cache.dataset.id
+        return frame
+
+    def scan(self, columns, start=None, end=None, products=None):
+        """Filtered partitions, scanned in parallel, one dataframe per partition"""
+        columns = list(columns)
+        plan, start, end = self._plan(columns, start, end, products)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(
+                lambda item: self._scan_partition(item[0], item[1], columns, start, end, products), plan
+            ))
+
+    def partition_frames(self, columns, dataset_ids=None, optional=()):
+        """Whole partitions minus superseded rows, keyed by dataset id.
+
+        Optional columns are included for the partitions that have them.
+        """
+        plan, _, _ = self._plan(list(columns), None, None, None)
+        plan = [item for item in plan if dataset_ids is None or item[0].dataset.id in dataset_ids]
+
+        def scan(item):
+            cache, spans = item
+            present = list(columns) + [col for col in optional if col in cache.manifest['columns']]
+            return cache.dataset.id, self._scan_partition(cache, spans, present, None, None, None)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return dict(executor.map(scan, plan))
+
+    def aggregate(self, value='sales_quantity', by='product_name', start=None, end=None, products=None):
+        """Grouped sum over all partitions, combined from per-partition partials"""
+        plan, start, end = self._plan([value, by], start, end, products)
+
+        def partial(item):
+            frame = self._scan_partition(item[0], item[1], [value, by], start, end, products)
+            values = pd.to_numeric(frame[value], errors='coerce')
+            return values.groupby(frame[by].astype(str)).sum()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            partials = list(executor.map(partial, plan))
+
+        if not partials:
+            return pd.Series(dtype=float, name=value)
+        return pd.concat(partials, axis=1).sum(axis=1).rename(value)
+
+    def compare_periods(self, current, previous, value='sales_quantity', by='product_name', products=None):
+        """Per-group totals for two (start, end) periods side by side"""
+        comparison = pd.DataFrame({
+            'current': self.aggregate(value, by, *current, products=products),
+            'previous': self.aggregate(value, by, *previous, products=products),
+        }).fillna(0)
+        comparison['change'] = comparison['current'] - comparison['previous']
+        previous_totals = comparison['previous'].replace(0, np.nan)
+        comparison['pct_change'] = (comparison['change'] / previous_totals * 100).round(1)
+        return comparison.sort_values('change', ascending=False)
+
+    def latest_date(self):
+        dates = [cache.manifest['date_max'] for cache in self.partitions() if cache.manifest['date_max']]
+        return pd.Timestamp(max(dates)) if dates else None
+
+    def year_over_year(self, value='sales_quantity', by='product_name', as_of=None, products=None):
+        """Year to date against the same span one year earlier"""
+        as_of = pd.Timestamp(as_of) if as_of is not None else self.latest_date()
+        if as_of is None:
+            return pd.DataFrame(columns=['current', 'previous', 'change', 'pct_change'])
+
+        year_start = pd.Timestamp(year=as_of.year, month=1, day=1)
+        year_ago = pd.DateOffset(years=1)
+        return self.compare_periods(
+            (year_start, as_of),
+            (year_start - year_ago, as_of - year_ago),
+            value, by, products
+        )
@@ -0,0 +1,273 @@
+from django.db import transaction
+from django.utils import timezone
+from ..models import ModelDriftState, Notification, Prediction
+from .automl import AutoMLEngine, load_model
+from .notification_feed import NotificationFeed
+from . import workers
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+
+N_BINS = 10
+MAX_CATEGORIES = 20
+WINDOW_SIZE = 200
+PSI_THRESHOLD = 0.25
+KS_COEFFICIENT = 1.358  # two-sample KS critical value at 5% significance
+EPSILON = 1e-4
+PREDICTION = '__prediction__'
+STALE_AFTER = timedelta(minutes=10)
+RETRY_AFTER = timedelta(hours=1)
+
+class FeatureSketch:
+    """Fixed-size histogram of one feature.
+
+    Numeric features are binned on training quantiles, categorical ones keep
+    the most frequent training categories; both add an overflow bin and a
+    missing bin. Sketches sharing a layout merge by adding counts.
+    """
+
+    def __init__(self, name, kind, bins, counts=None):
+        self.name = name
+        self.kind = kind
+        self.bins = list(bins)
+        self.counts = np.zeros(len(self.bins) + 2) if counts is None else np.asarray(counts, dtype=float)
+
+    @classmethod
+    def fit(cls, name, values):
+        values = pd.Series(values)
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            finite = values.to_numpy(dtype=float)
+            finite = finite[np.isfinite(finite)]
+            edges = np.unique(np.quantile(finite, np.linspace(0, 1, N_BINS + 1)[1:-1])) if len(finite) else []
+            sketch = cls(name, 'numeric', np.asarray(edges).tolist())
+        else:
+            top = values.dropna().astype(str).value_counts().index[:MAX_CATEGORIES]
+            sketch = cls(name, 'category', top.tolist())
+        return sketch.add(values)
+
+    @classmethod
+    def from_dict(cls, data, counts=None):
+        return cls(data['name'], data['kind'], data['bins'], data['counts'] if counts is None else counts)
+
+    def to_dict(self):
+        return {'name': self.name, 'kind': self.kind, 'bins': self.bins, 'counts': self.counts.tolist()}
+
+    def empty(self):
+        return FeatureSketch(self.name, self.kind, self.bins)
+
+    @property
+    def total(self):
+        return float(self.counts.sum())
+
+    def bin_index(self, values):
+        values = pd.Series(values, dtype=object)
+        values = values.mask(values.astype(str).str.strip() == '')
+        missing = values.isna().to_numpy(copy=True)
+        if self.kind == 'numeric':
+            x = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)
+            index = np.searchsorted(np.asarray(self.bins, dtype=float), x, side='right')
+            missing |= np.isnan(x)
+        else:
+            index = pd.Index(self.bins).get_indexer(values.astype(str))
+            index = np.where(index < 0, len(self.bins), index)
+        return np.where(missing, len(self.bins) + 1, index)
+
+    def add(self, values):
+        self.counts += np.bincount(self.bin_index(values), minlength=len(self.counts))
+        return self
+
+    def merge(self, other):
+        if (self.kind, self.bins) != (other.kind, other.bins):
+            raise ValueError(f"Cannot merge sketches of '{self.name}' with different layouts")
+        return FeatureSketch(self.name, self.kind, self.bins, self.counts + other.counts)
+
+    def psi(self, actual):
+        """Population stability index of actual against this sketch"""
+        expected = np.clip(self.counts / max(self.total, 1), EPSILON, None)
+        observed = np.clip(actual.counts / max(actual.total, 1), EPSILON, None)
+        return float(np.sum((observed - expected) * np.log(observed / expected)))
+
+    def ks(self, actual):
+        """KS statistic on the binned distributions and its 5% critical value"""
+        if self.kind != 'numeric':
+            return None, None
+        expected, observed = self.counts[:-1], actual.counts[:-1]
+        n, m = expected.sum(), observed.sum()
+        if not n or not m:
+            return None, None
+        statistic = np.abs(np.cumsum(expected) / n - np.cumsum(observed) / m).max()
+        return float(statistic), float(KS_COEFFICIENT * np.sqrt((n + m) / (n * m)))
+
+def compute_baseline(dataset_path, model_path):
+    """Baseline sketches from a model's training split.
+
+    Runs inside a worker process, so it only takes plain data.
+    """
+    automl = AutoMLEngine(dataset_path)
+    automl.split()
+    baseline = DriftMonitor.profile(automl.X_train, load_model(model_path).predict(automl.X_train))
+    return [sketch.to_dict() for sketch in baseline], len(automl.X_train)
+
+class DriftMonitor:
+    """Training-time feature sketches compared against windows of prediction traffic"""
+
+    def __init__(self, ml_model):
+        self.ml_model = ml_model
+
+    @staticmethod
+    def profile(X, predictions):
+        """Baseline sketches for every feature and the model output"""
+        sketches = [FeatureSketch.fit(col, X[col]) for col in X.columns]
+        sketches.append(FeatureSketch.fit(PREDICTION, pd.Series(np.asarray(predictions).ravel())))
+        return sketches
+
+    @property
+    def model_path(self):
+        return (self.ml_model.serving_file or self.ml_model.model_file).path
+
+    def start(self, X_train):
+        """Record the baseline from the training split of a freshly trained model"""
+        baseline = self.profile(X_train, load_model(self.model_path).predict(X_train))
+        return self._save([sketch.to_dict() for sketch in baseline], len(X_train))
+
+    def _save(self, baseline, baseline_total, window=None, window_total=0):
+        if window is None:
+            window = [FeatureSketch.from_dict(data).empty() for data in baseline]
+        state, _ = ModelDriftState.objects.update_or_create(
+            ml_model=self.ml_model,
+            defaults={
+                'baseline': baseline,
+                'baseline_total': baseline_total,
+                'window': [sketch.counts.tolist() for sketch in window],
+                'window_total': window_total,
+                'status': 'ready',
+            }
+        )
+        return state
+
+    def state(self):
+        """Drift state; baselines of models trained before monitoring are queued on the worker pool"""
+        state, created = ModelDriftState.objects.get_or_create(ml_model=self.ml_model, defaults={'status': 'pending'})
+        if created or self._claim(state):
+            workers.submit(compute_baseline, self.ml_model.dataset.file.path, self.model_path, on_done=self._store)
+        return state
+
+    def _claim(self, state):
+        """Requeue a stalled or long-failed build; only one concurrent request wins the update"""
+        age = timezone.now() - state.updated_at
+        if not ((state.status == 'pending' and age > STALE_AFTER) or (state.status == 'failed' and age > RETRY_AFTER)):
+            return False
+        return ModelDriftState.objects.filter(
+            pk=state.pk, status=state.status, updated_at=state.updated_at
+        ).update(status='pending', updated_at=timezone.now()) == 1
+
+    def _store(self, future):
+        """Save a finished baseline job, filling the window from predictions logged meanwhile"""
+        try:
+            baseline, baseline_total = future.result()
+        except Exception as e:
+            print(f"Error building drift baseline: {str(e)}")
+            ModelDriftState.objects.filter(ml_model=self.ml_model).update(status='failed', updated_at=timezone.now())
+            return
+
+        window = [FeatureSketch.from_dict(data).empty() for data in baseline]
+        recent = Prediction.objects.filter(ml_model=self.ml_model).order_by('-created_at')[:WINDOW_SIZE - 1]
+        recent = list(recent)[::-1]
+        self._add(
+            window,
+            pd.DataFrame([prediction.input_data for prediction in recent]),
+            [self._output(prediction.output_data) for prediction in recent]
+        )
+        self._save(baseline, baseline_total, window, len(recent))
+
+    @staticmethod
+    def _output(output_data):
+        value = output_data.get('prediction')
+        return value[0] if isinstance(value, list) and value else value
+
+    @staticmethod
+    def _add(window, frame, predictions):
+        for sketch in window:
+            if sketch.name == PREDICTION:
+                sketch.add(list(predictions))
+            else:
+                sketch.add(frame[sketch.name] if sketch.name in frame.columns else [None] * len(frame))
+
+    def observe(self, rows, predictions):
+        """Add prediction traffic to the current window, checking drift when it fills.
+
+        Traffic arriving before the baseline is ready is skipped; the build
+        backfills the window from logged predictions.
+        """
+        if self.state().status != 'ready':
+            return None
+        frame = pd.DataFrame(list(rows))
+        with transaction.atomic():
+            state = ModelDriftState.objects.select_for_update().get(ml_model=self.ml_model)
+            baseline, window = self._sketches(state)
+            self._add(window, frame, predictions)
+            state.window = [sketch.counts.tolist() for sketch in window]
+            state.window_total += len(frame)
+
+            if state.window_total >= WINDOW_SIZE:
+                state.last_report = self.compare(baseline, window, state.window_total)
+                state.checks += 1
+                if state.last_report['drifted']:
+                    self._notify(state)
+                state.window = [sketch.empty().counts.tolist() for sketch in window]
+                state.window_total = 0
+            state.save()
+        return state
+
+    @staticmethod
+    def _sketches(state):
+        baseline = [FeatureSketch.from_dict(data) for data in state.baseline]
+        window = [FeatureSketch.from_dict(data, counts) for data, counts in zip(state.baseline, state.window)]
+        return baseline, window
+
+    @staticmethod
+    def compare(baseline, window, observations):
+        """PSI for every sketch and binned KS for numeric ones"""
+        features, drifted = {}, []
+        for expected, actual in zip(baseline, window):
+            psi = expected.psi(actual)
+            ks, critical = expected.ks(actual)
+            is_drifted = psi > PSI_THRESHOLD or (ks is not None and ks > critical)
+            features[expected.name] = {'psi': round(psi, 4), 'ks': ks, 'ks_critical': critical, 'drifted': is_drifted}
+            if is_drifted:
+                drifted.append(expected.name)
+        return {
+            'checked_at': timezone.now().isoformat(),
+            'observations': int(observations),
+            'features': features,
+            'drifted': drifted,
+        }
+
+    def report(self):
+        """Last completed check plus the partially filled current window"""
+        state = self.state()
+        if state.status != 'ready':
+            return {'baseline_status': state.status, 'window_size': WINDOW_SIZE, 'checks': 0, 'last_report': None}
+        baseline, window = self._sketches(state)
+        return {
+            'baseline_status': state.status,
+            'baseline_size': state.baseline_total,
+            'window_size': WINDOW_SIZE,
+            'window_observations': state.window_total,
+            'checks': state.checks,
+            'last_report': state.last_report,
+            'current': self.compare(baseline, window, state.window_total) if state.window_total else None,
+        }
+
+    def _notify(self, state):
+        report = state.last_report
+        names = ['model output' if name == PREDICTION else name for name in report['drifted']]
+        worst = max(report['features'][name]['psi'] for name in report['drifted'])
+        Notification.objects.bulk_create([Notification(
+            business=self.ml_model.dataset.business,
+            message=(f"Drift detected for {self.ml_model.name} over the last {report['observations']} "
+                     f"predictions: {', '.join(names)} (max PSI {worst:.2f}). Consider retraining"),
+            notification_type='model_drift',
+            dedup_key=f"model_drift:{self.ml_model.id}:{state.checks}"
+        )], ignore_conflicts=True)
+        NotificationFeed(self.ml_model.dataset.business_id).publish()
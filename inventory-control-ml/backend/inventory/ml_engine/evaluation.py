@@ -0,0 +1,73 @@
+from sklearn.base import clone
+from sklearn.model_selection import KFold, StratifiedKFold, TimeSeriesSplit, cross_validate
+import numpy as np
+import pickle
+import time
+
+SCORING = {
+    'classification': {'accuracy': 'accuracy', 'f1_macro': 'f1_macro'},
+    'regression': {'r2': 'r2', 'mae': 'neg_mean_absolute_error'},
+}
+PRIMARY_METRIC = {'classification': 'accuracy', 'regression': 'r2'}
+LOWER_IS_BETTER = {'mae'}
+
+class ModelEvaluator:
+    """Cross-validated metrics plus serving cost for a fitted pipeline"""
+
+    def __init__(self, problem_type, n_splits=5, random_state=42, n_jobs=-1):
+        self.problem_type = problem_type
+        self.n_splits = n_splits
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+
+    def splitter(self, y, time_ordered=False):
+        """Time-ordered folds for dated rows, shuffled k-fold otherwise"""
+        if time_ordered:
+            return TimeSeriesSplit(n_splits=self.n_splits), 'time_series'
+        if self.problem_type == 'classification' and y.value_counts().min() >= self.n_splits:
+            return StratifiedKFold(self.n_splits, shuffle=True, random_state=self.random_state), 'stratified_kfold'
+        return KFold(self.n_splits, shuffle=True, random_state=self.random_state), 'kfold'
+
+    def evaluate(self, pipeline, X, y, time_ordered=False):
+        """Run CV folds in parallel and measure the fitted pipeline's serving cost.
+
+        Rows must already be in time order when time_ordered is set.
+        """
+        cv, strategy = self.splitter(y, time_ordered)
+        results = cross_validate(
+            clone(pipeline), X, y,
+            cv=cv,
+            scoring=SCORING[self.problem_type],
+            n_jobs=self.n_jobs,
+            error_score='raise'
+        )
+
+        fold_scores = {}
+        for name in SCORING[self.problem_type]:
+            scores = results[f"test_{name}"]
+            fold_scores[name] = (-scores if name in LOWER_IS_BETTER else scores).tolist()
+
+        primary = np.array(fold_scores[PRIMARY_METRIC[self.problem_type]])
+        return {
+            'metric': PRIMARY_METRIC[self.problem_type],
+            'cv_strategy': strategy,
+            'n_splits': self.n_splits,
+            'fold_scores': fold_scores,
+            'mean_score': float(primary.mean()),
+            'std_score': float(primary.std()),
+            'fit_time_ms': float(results['fit_time'].mean() * 1000),
+            'predict_latency_ms': self.predict_latency_ms(pipeline, X),
+            'model_size_bytes': len(pickle.dumps(pipeline)),
+        }
+
+    @staticmethod
+    def predict_latency_ms(pipeline, X, repeats=20):
+        """Median latency of a single-row prediction, as served by PredictView"""
+        row = X.iloc[[0]]
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            pipeline.predict(row)
+            timings.append(time.perf_counter() - start)
+        return float(np.median(timings) * 1000)
+
@@ -0,0 +1,180 @@
+from django.utils import timezone
+from sklearn.pipeline import Pipeline
+from ..models import Explanation
+from .automl import load_model
+from . import workers
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+import hashlib
+import json
+
+try:
+    import shap
+except ImportError:
+    shap = None
+
+BACKGROUND_SIZE = 100
+BATCH_SIZE = 256
+GLOBAL_HASH = 'global'
+STALE_AFTER = timedelta(minutes=10)
+
+def input_hash(row):
+    return hashlib.sha256(json.dumps(row, sort_keys=True, default=str).encode()).hexdigest()
+
+def _frame(rows, columns):
+    """Rows as a dataframe in training column order, numeric strings converted"""
+    df = pd.DataFrame(list(rows), columns=columns)
+    for col in df.columns:
+        converted = pd.to_numeric(df[col], errors='coerce')
+        if converted.notna().sum() == df[col].notna().sum():
+            df[col] = converted
+    return df
+
+def compute_attributions(model_path, rows, background, summarize=False):
+    """SHAP values for rows, or mean |SHAP| per feature when summarizing.
+
+    Runs inside a worker process, so it only takes plain data.
+    """
+    if shap is None:
+        raise ImportError("The shap package is required for explanations")
+
+    pipeline = load_model(model_path)
+    background = pd.DataFrame(background)
+    columns = list(background.columns)
+    X = _frame(rows, columns)
+    background = _frame(background.to_dict('records'), columns)
+
+    try:
+        # Fast path: exact tree SHAP on the final estimator over transformed features
+        X_model = X
+        final = pipeline
+        if isinstance(pipeline, Pipeline):
+            X_model = pipeline[:-1].transform(X) if len(pipeline) > 1 else X
+            final = pipeline[-1]
+        explainer = shap.TreeExplainer(final)
+        values = explainer.shap_values(X_model)
+        width = np.shape(X_model)[1]
+        names = columns if width == len(columns) else [f"feature_{i}" for i in range(width)]
+    except Exception:
+        # Model-agnostic fallback against a sampled background set
+        predict = pipeline.predict_proba if hasattr(pipeline, 'predict_proba') else pipeline.predict
+        explainer = shap.KernelExplainer(
+            lambda data: predict(pd.DataFrame(data, columns=columns)),
+            shap.sample(background, min(BACKGROUND_SIZE, len(background)), random_state=0)
+        )
+        values = explainer.shap_values(X, silent=True)
+        names = columns
+
+    values = np.stack(values, axis=-1) if isinstance(values, list) else np.asarray(values)
+    base_values = np.atleast_1d(explainer.expected_value)
+
+    if summarize:
+        magnitude = np.abs(values).mean(axis=0)
+        if magnitude.ndim == 2:
+            magnitude = magnitude.sum(axis=1)
+        return dict(zip(names, magnitude.tolist()))
+
+    if values.ndim == 3:
+        # Attribute classifier outputs to the predicted class
+        classes = list(pipeline.classes_)
+        class_index = np.array([classes.index(label) for label in pipeline.predict(X)])
+        values = values[np.arange(len(X)), :, class_index]
+        base_values = base_values[class_index]
+    else:
+        base_values = np.repeat(base_values[0], len(X))
+
+    return [
+        {'features': names, 'values': row.tolist(), 'base_value': float(base)}
+        for row, base in zip(values, base_values)
+    ]
+
+class ExplanationEngine:
+    def __init__(self, ml_model):
+        self.ml_model = ml_model
+        self._background = None
+
+    @property
+    def model_path(self):
+        return self.ml_model.model_file.path
+
+    def background(self):
+        """Sampled training rows used as the SHAP reference set"""
+        if self._background is None:
+            df = pd.read_csv(self.ml_model.dataset.file.path)
+            df = df.drop(columns=['target'], errors='ignore')
+            self._background = df.sample(min(BACKGROUND_SIZE, len(df)), random_state=0).to_dict('records')
+        return self._background
+
+    def _needs_run(self, explanation):
+        if explanation.status == 'failed':
+            return True
+        return explanation.status == 'pending' and timezone.now() - explanation.updated_at > STALE_AFTER
+
+    def _rows(self, keys):
+        return Explanation.objects.filter(ml_model=self.ml_model, input_hash__in=list(keys))
+
+    def global_importance(self):
+        """Cached global feature importances, queued on the worker pool if missing"""
+        explanation, created = Explanation.objects.get_or_create(
+            ml_model=self.ml_model, kind='global', input_hash=GLOBAL_HASH
+        )
+        if created or self._needs_run(explanation):
+            self._rows([GLOBAL_HASH]).update(status='pending', updated_at=timezone.now())
+            workers.submit(
+                compute_attributions, self.model_path, self.background(), self.background(), True,
+                on_done=lambda future: self._store([GLOBAL_HASH], future)
+            )
+        return explanation
+
+    def explain(self, rows, inline=False):
+        """Per-row attributions keyed by input hash; None while still computing"""
+        rows = list(rows)
+        hashes = [input_hash(row) for row in rows]
+        existing = {explanation.input_hash: explanation for explanation in self._rows(hashes).filter(kind='local')}
+
+        missing = {}
+        for key, row in zip(hashes, rows):
+            explanation = existing.get(key)
+            if explanation is None or self._needs_run(explanation):
+                missing[key] = row
+
+        if missing and inline:
+            results = compute_attributions(self.model_path, list(missing.values()), self.background())
+            for key, values in zip(missing, results):
+                existing[key], _ = Explanation.objects.update_or_create(
+                    ml_model=self.ml_model, kind='local', input_hash=key,
+                    defaults={'status': 'ready', 'values': values}
+                )
+        elif missing:
+            Explanation.objects.bulk_create(
+                [Explanation(ml_model=self.ml_model, kind='local', input_hash=key) for key in missing],
+                ignore_conflicts=True
+            )
+            self._rows(missing).update(status='pending', updated_at=timezone.now())
+            keys = list(missing)
+            for start in range(0, len(keys), BATCH_SIZE):
+                batch = keys[start:start + BATCH_SIZE]
+                workers.submit(
+                    compute_attributions, self.model_path, [missing[key] for key in batch], self.background(),
+                    on_done=lambda future, batch=batch: self._store(batch, future)
+                )
+
+        return {
+            key: existing[key].values if key in existing and existing[key].status == 'ready' else None
+            for key in hashes
+        }
+
+    def _store(self, keys, future):
+        """Save a finished worker job against its pending explanation rows"""
+        try:
+            results = future.result()
+        except Exception as e:
+            print(f"Error computing explanations: {str(e)}")
+            self._rows(keys).update(status='failed', updated_at=timezone.now())
+            return
+
+        if keys == [GLOBAL_HASH]:
+            results = [results]
+        for key, values in zip(keys, results):
+            self._rows([key]).update(status='ready', values=values, updated_at=timezone.now())
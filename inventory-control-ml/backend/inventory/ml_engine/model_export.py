@@ -0,0 +1,198 @@
+from sklearn.ensemble import ExtraTreesClassifier, ExtraTreesRegressor, RandomForestClassifier, RandomForestRegressor
+from sklearn.feature_selection import VarianceThreshold
+from sklearn.linear_model import ElasticNet, Lasso, LinearRegression, LogisticRegression, Ridge, RidgeCV, LassoCV
+from sklearn.pipeline import Pipeline, make_pipeline
+from sklearn.preprocessing import FunctionTransformer, MaxAbsScaler, MinMaxScaler, RobustScaler, StandardScaler
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+import numpy as np
+import pandas as pd
+import time
+
+TREE_MODELS = (DecisionTreeClassifier, DecisionTreeRegressor, RandomForestClassifier, RandomForestRegressor,
+               ExtraTreesClassifier, ExtraTreesRegressor)
+LINEAR_MODELS = (LinearRegression, Ridge, RidgeCV, Lasso, LassoCV, ElasticNet, LogisticRegression)
+
+class CompiledModel:
+    """NumPy-only inference for an affine preprocessing step followed by trees or a linear model"""
+
+    def __init__(self, feature_names, shift, scale, kind, params, classes=None):
+        self.feature_names = list(feature_names)
+        self.shift = shift
+        self.scale = scale
+        self.kind = kind
+        self.params = params
+        self.classes = classes
+
+    def _features(self, X):
+        if isinstance(X, pd.DataFrame):
+            X = X[self.feature_names]
+        return (np.asarray(X, dtype=np.float64) - self.shift) * self.scale
+
+    def predict(self, X):
+        X = self._features(X)
+        output = self._predict_trees(X) if self.kind == 'trees' else self._predict_linear(X)
+        if self.classes is None:
+            return output
+        if output.shape[1] == 1:
+            return self.classes[(output[:, 0] > 0).astype(int)]
+        return self.classes[np.argmax(output, axis=1)]
+
+    def _predict_trees(self, X):
+        p = self.params
+        # Trees compare float32 features against float64 thresholds, as sklearn does
+        X = X.astype(np.float32)
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(p['roots'], (len(X), len(p['roots']))).copy()
+        for _ in range(p['max_depth']):
+            left = p['left'][node]
+            go_left = X[rows, p['feature'][node]] <= p['threshold'][node]
+            node = np.where(left < 0, node, np.where(go_left, left, p['right'][node]))
+        return p['value'][node].mean(axis=1)
+
+    def _predict_linear(self, X):
+        output = X @ self.params['coef'].T + self.params['intercept']
+        return output if self.classes is not None else output.ravel()
+
+class ModelExporter:
+    """Flatten a fitted pipeline and, where possible, compile it to flat arrays"""
+
+    def __init__(self, pipeline, feature_names):
+        self.pipeline = pipeline
+        self.feature_names = list(feature_names)
+
+    @staticmethod
+    def _is_noop(step):
+        if step is None or step == 'passthrough':
+            return True
+        if isinstance(step, FunctionTransformer) and step.func is None:
+            return True
+        if isinstance(step, VarianceThreshold) and hasattr(step, 'variances_'):
+            return bool(step.get_support().all())
+        return False
+
+    def flatten(self):
+        """Nested pipelines expanded into one step list with no-op steps dropped"""
+        def expand(estimator):
+            if isinstance(estimator, Pipeline):
+                return [step for _, inner in estimator.steps for step in expand(inner)]
+            return [] if self._is_noop(estimator) else [estimator]
+
+        steps = expand(self.pipeline)
+        return steps[0] if len(steps) == 1 else make_pipeline(*steps)
+
+    def compile(self):
+        """CompiledModel for supported step shapes, or None"""
+        flattened = self.flatten()
+        steps = [step for _, step in flattened.steps] if isinstance(flattened, Pipeline) else [flattened]
+        *transformers, final = steps
+
+        n_features = len(self.feature_names)
+        shift, scale = np.zeros(n_features), np.ones(n_features)
+        for transformer in transformers:
+            step_shift, step_scale = self._affine(transformer, n_features)
+            if step_shift is None:
+                return None
+            # Fold (x - s1) * k1 then (. - s2) * k2 into one shift and scale
+            shift = shift + step_shift / scale
+            scale = scale * step_scale
+
+        classes = getattr(final, 'classes_', None)
+        if isinstance(final, TREE_MODELS):
+            if getattr(final, 'n_outputs_', 1) != 1:
+                return None
+            return CompiledModel(self.feature_names, shift, scale, 'trees', self._flatten_trees(final), classes)
+        if isinstance(final, LINEAR_MODELS):
+            coef = np.atleast_2d(final.coef_)
+            intercept = np.atleast_1d(final.intercept_)
+            return CompiledModel(self.feature_names, shift, scale, 'linear', {'coef': coef, 'intercept': intercept}, classes)
+        return None
+
+    @staticmethod
+    def _affine(transformer, n_features):
+        if isinstance(transformer, StandardScaler):
+            mean = transformer.mean_ if transformer.with_mean else np.zeros(n_features)
+            std = transformer.scale_ if transformer.with_std else np.ones(n_features)
+            return mean, 1 / std
+        if isinstance(transformer, MinMaxScaler) and not transformer.clip:
+            return -transformer.min_ / transformer.scale_, transformer.scale_
+        if isinstance(transformer, MaxAbsScaler):
+            return np.zeros(n_features), 1 / transformer.scale_
+        if isinstance(transformer, RobustScaler):
+            center = transformer.center_ if transformer.with_centering else np.zeros(n_features)
+            spread = transformer.scale_ if transformer.with_scaling else np.ones(n_features)
+            return center, 1 / spread
+        return None, None
+
+    @staticmethod
+    def _flatten_trees(model):
+        """Every tree's nodes concatenated into shared arrays with global child indices"""
+        trees = [model.tree_] if hasattr(model, 'tree_') else [estimator.tree_ for estimator in model.estimators_]
+        feature, threshold, left, right, value, roots = [], [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            roots.append(offset)
+            feature.append(np.maximum(tree.feature, 0))
+            threshold.append(tree.threshold)
+            left.append(np.where(tree.children_left < 0, -1, tree.children_left + offset))
+            right.append(np.where(tree.children_right < 0, -1, tree.children_right + offset))
+            leaf_value = tree.value[:, 0, :]
+            if hasattr(model, 'classes_'):
+                leaf_value = leaf_value / leaf_value.sum(axis=1, keepdims=True)
+            value.append(leaf_value)
+            offset += tree.node_count
+
+        value = np.concatenate(value)
+        return {
+            'feature': np.concatenate(feature).astype(np.intp),
+            'threshold': np.concatenate(threshold),
+            'left': np.concatenate(left).astype(np.intp),
+            'right': np.concatenate(right).astype(np.intp),
+            'value': value if hasattr(model, 'classes_') else value[:, 0],
+            'roots': np.array(roots, dtype=np.intp),
+            'max_depth': max(tree.max_depth for tree in trees),
+        }
+
+    @staticmethod
+    def latency_ms(model, X, repeats=20):
+        row = X.iloc[[0]]
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model.predict(row)
+            timings.append(time.perf_counter() - start)
+        return float(np.median(timings) * 1000)
+
+    @staticmethod
+    def equivalent(reference, candidate, X):
+        expected, actual = np.asarray(reference.predict(X)), np.asarray(candidate.predict(X))
+        if expected.shape != actual.shape:
+            return False
+        if np.issubdtype(expected.dtype, np.number) and np.issubdtype(actual.dtype, np.number):
+            return bool(np.allclose(expected, actual, rtol=1e-6, atol=1e-9))
+        return bool(np.array_equal(expected, actual))
+
+    def export(self, X_holdout):
+        """Fastest artifact whose holdout predictions match the original pipeline"""
+        X_holdout = X_holdout[self.feature_names]
+        candidates = [('pipeline', self.pipeline)]
+
+        flattened = self.flatten()
+        if self.equivalent(self.pipeline, flattened, X_holdout):
+            candidates.append(('flattened', flattened))
+        try:
+            compiled = self.compile()
+        except Exception as e:
+            print(f"Error compiling model: {str(e)}")
+            compiled = None
+        if compiled is not None and self.equivalent(self.pipeline, compiled, X_holdout):
+            candidates.append(('compiled', compiled))
+
+        timed = [(self.latency_ms(model, X_holdout), kind, model) for kind, model in candidates]
+        baseline = timed[0][0]
+        latency, kind, model = min(timed, key=lambda item: item[0])
+        return {
+            'kind': kind,
+            'model': model,
+            'baseline_latency_ms': baseline,
+            'latency_ms': latency,
+        }
@@ -0,0 +1,121 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+from ..models import Notification
+import json
+import time
+
+CACHE_TIMEOUT = 30
+POLL_INTERVAL = 1.0
+HEARTBEAT_INTERVAL = 15
+STREAM_DURATION = 55
+MAX_WAIT = 25
+BATCH_SIZE = 50
+PAGE_SIZE = 100
+
+class NotificationFeed:
+    """Per-business notification cursor and unread counter served from the cache.
+
+    Creating notifications invalidates the cached values once the write
+    commits, so waiting clients only touch the database when something
+    changed; the short timeout bounds staleness from concurrent refills.
+    """
+
+    def __init__(self, business):
+        self.business_id = getattr(business, 'pk', business)
+        self.latest_key = f"notifications:{self.business_id}:latest"
+        self.unread_key = f"notifications:{self.business_id}:unread"
+
+    def publish(self):
+        """Signal new or changed notifications to connected clients"""
+        transaction.on_commit(lambda: cache.delete_many([self.latest_key, self.unread_key]))
+
+    def latest_id(self):
+        latest = cache.get(self.latest_key)
+        if latest is None:
+            latest = Notification.objects.filter(business_id=self.business_id).aggregate(latest=Max('id'))['latest'] or 0
+            cache.set(self.latest_key, latest, CACHE_TIMEOUT)
+        return latest
+
+    def unread_count(self):
+        unread = cache.get(self.unread_key)
+        if unread is None:
+            unread = Notification.objects.filter(business_id=self.business_id, is_read=False).count()
+            cache.set(self.unread_key, unread, CACHE_TIMEOUT)
+        return unread
+
+    def since(self, cursor, limit=BATCH_SIZE):
+        """Notifications created after the cursor, oldest first"""
+        if self.latest_id() <= cursor:
+            return []
+        return list(Notification.objects.filter(business_id=self.business_id, id__gt=cursor).order_by('id')[:limit])
+
+    def recent(self, limit=PAGE_SIZE, before=None):
+        """Latest notifications, newest first, optionally older than a cursor"""
+        notifications = Notification.objects.filter(business_id=self.business_id)
+        if before is not None:
+            notifications = notifications.filter(id__lt=before)
+        return list(notifications.order_by('-id')[:limit])
+
+    def wait(self, cursor, timeout=MAX_WAIT):
+        """Long poll: block until notifications newer than the cursor exist or the timeout passes"""
+        deadline = time.monotonic() + max(0, min(float(timeout), MAX_WAIT))
+        while True:
+            notifications = self.since(cursor)
+            if notifications or time.monotonic() >= deadline:
+                return notifications
+            time.sleep(POLL_INTERVAL)
+
+    def mark_read(self, up_to_id, from_id=None):
+        """Mark notifications in a cursor range as read, skipping the UPDATE when none are unread"""
+        if not self.unread_count():
+            return 0
+        unread = Notification.objects.filter(business_id=self.business_id, is_read=False, id__lte=up_to_id)
+        if from_id is not None:
+            unread = unread.filter(id__gte=from_id)
+        updated = unread.update(is_read=True)
+        self.publish()
+        return updated
+
+    @staticmethod
+    def serialize(notification):
+        return {
+            'id': notification.id,
+            'message': notification.message,
+            'notification_type': notification.notification_type,
+            'is_read': notification.is_read,
+            'created_at': notification.created_at.isoformat(),
+        }
+
+    def events(self, cursor, duration=STREAM_DURATION):
+        """Server-sent events for notifications after the cursor and unread count changes.
+
+        The stream ends after duration seconds; EventSource reconnects and
+        resumes from the Last-Event-ID it received. Each open stream holds a
+        server worker, so it needs an ASGI or threaded deployment; the pages
+        themselves poll NotificationFeedView instead.
+        """
+        deadline = time.monotonic() + duration
+        last_sent = time.monotonic()
+        unread = None
+        yield "retry: 3000\n\n"
+
+        while True:
+            for notification in self.since(cursor):
+                cursor = notification.id
+                last_sent = time.monotonic()
+                yield f"id: {cursor}\nevent: notification\ndata: {json.dumps(self.serialize(notification))}\n\n"
+
+            count = self.unread_count()
+            if count != unread:
+                unread = count
+                last_sent = time.monotonic()
+                yield f"event: unread\ndata: {json.dumps({'unread': unread})}\n\n"
+
+            now = time.monotonic()
+            if now >= deadline:
+                return
+            if now - last_sent >= HEARTBEAT_INTERVAL:
+                last_sent = now
+                yield ": keep-alive\n\n"
+            time.sleep(POLL_INTERVAL)
@@ -1,18 +1,24 @@
 from django.utils import timezone
 from ..models import Notification
+from .anomaly import SalesAnomalyDetector
+from .classification import ProductClassifier
+from .seasonality import SeasonalityAnalyzer
+import numpy as np
 import pandas as pd
+import calendar
 
 class NotificationEngine:
     def __init__(self, business):
         self.business = business
     
-    def generate_initial_notifications(self, df):
+    def generate_initial_notifications(self, df, dataset=None):
         """Generate initial notifications after data upload"""
         try:
             self._generate_upload_notification()
             self._generate_stock_alerts(df)
             self._generate_sales_trends(df)
-            self._generate_seasonal_products(df)
+            self._generate_seasonal_products(df, dataset)
+            self._generate_sales_anomalies(df)
         except Exception as e:
             print(f"Error generating notifications: {str(e)}")
     
@@ -28,11 +34,22 @@ class NotificationEngine:
         """Generate notifications for low stock items"""
         if all(col in df.columns for col in ['current_stock', 'min_required']):
             low_stock = df[df['current_stock'] < df['min_required']]
+            if 'product_name' in low_stock.columns:
+                try:
+                    # Tag alerts with the product class; A items are created last so they list first
+                    classes = ProductClassifier(self.business).classes()
+                    low_stock = ProductClassifier.annotate(low_stock, classes)
+                    rank = low_stock['abc_class'].map({'A': 0, 'B': 1, 'C': 2}).fillna(3)
+                    low_stock = low_stock.iloc[np.argsort(-rank.to_numpy(), kind='stable')]
+                except Exception as e:
+                    print(f"Error classifying stock alerts: {str(e)}")
             for _, item in low_stock.iterrows():
                 product_name = item.get('product_name', 'Unknown product')
+                product_class = item.get('abc_class', '-') + item.get('xyz_class', '-')
+                tag = f" [class {product_class}]" if '-' not in product_class else ""
                 Notification.objects.create(
                     business=self.business,
-                    message=f"Low stock alert: {product_name} "
+                    message=f"Low stock alert: {product_name}{tag} "
                             f"(Current: {item['current_stock']}, Required: {item['min_required']})",
                     notification_type='stock_alert'
                 )
@@ -54,23 +71,28 @@ class NotificationEngine:
             except Exception as e:
                 print(f"Error generating sales trends: {str(e)}")
     
-    def _generate_seasonal_products(self, df):
+    def _generate_sales_anomalies(self, df):
+        """Score new sales rows against each product's stored history"""
+        try:
+            SalesAnomalyDetector(self.business).process(df)
+        except Exception as e:
+            print(f"Error detecting sales anomalies: {str(e)}")
+    
+    def _generate_seasonal_products(self, df, dataset=None):
         """Generate notifications for seasonal products"""
         if all(col in df.columns for col in ['date', 'product_name', 'sales_quantity']):
             try:
-                df['date'] = pd.to_datetime(df['date'])
-                df['month'] = df['date'].dt.month
-                monthly_sales = df.groupby(['product_name', 'month'])['sales_quantity'].sum().unstack()
-                monthly_sales = monthly_sales.fillna(0)
-                
-                for product in monthly_sales.index:
-                    sales = monthly_sales.loc[product]
-                    if sales.max() > 2 * sales.min():  # Significant variation
-                        peak_month = sales.idxmax()
-                        Notification.objects.create(
-                            business=self.business,
-                            message=f"Product {product} shows seasonal pattern with peak in month {peak_month}",
-                            notification_type='seasonal_product'
-                        )
+                if dataset is not None:
+                    seasonality = SeasonalityAnalyzer.for_dataset(dataset)
+                else:
+                    seasonality = SeasonalityAnalyzer.from_frame(df)
+
+                for _, item in seasonality.seasonal_products('month').iterrows():
+                    Notification.objects.create(
+                        business=self.business,
+                        message=f"Product {item['product_name']} shows seasonal pattern with peak in "
+                                f"{calendar.month_name[item['peak']]} (strength {item['strength']:.2f})",
+                        notification_type='seasonal_product'
+                    )
             except Exception as e:
                 print(f"Error generating seasonal products: {str(e)}")
\ No newline at end of file
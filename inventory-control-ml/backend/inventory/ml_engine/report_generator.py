@@ -1,6 +1,10 @@
 from ..models import Notification, MLModel, Dataset, Business
+from .dataset_table import BusinessDatasetTable
+from .seasonality import SeasonalityAnalyzer
+from .classification import ProductClassifier
 from datetime import datetime
 import pandas as pd
+import calendar
 
 class ReportGenerator:
     def __init__(self, business):
@@ -45,8 +49,27 @@ class ReportGenerator:
                     total_sales = df['sales_quantity'].sum()
                     report_lines.append(f"\nSALES ANALYSIS:")
                     report_lines.append(f"Total sales: {total_sales}")
+
+                seasonal = SeasonalityAnalyzer.for_dataset(latest_dataset).seasonal_products('month')
+                if not seasonal.empty:
+                    report_lines.append(f"\nSEASONAL PRODUCTS:")
+                    for _, item in seasonal.head(5).iterrows():
+                        report_lines.append(
+                            f"- {item['product_name']}: peak in {calendar.month_name[item['peak']]} "
+                            f"(strength {item['strength']:.2f}, p={item['p_value']:.3f})"
+                        )
             except Exception as e:
                 report_lines.append(f"\nError analyzing dataset: {str(e)}")
+
+            try:
+                report_lines.extend(self._product_classes(df))
+            except Exception as e:
+                report_lines.append(f"\nError classifying products: {str(e)}")
+
+            try:
+                report_lines.extend(self._period_comparison())
+            except Exception as e:
+                report_lines.append(f"\nError comparing periods: {str(e)}")
         
         # Notifications Summary
         notifications = Notification.objects.filter(business=self.business).order_by('-created_at')[:10]
@@ -60,7 +83,43 @@ class ReportGenerator:
         if Notification.objects.filter(business=self.business, notification_type='stock_alert', is_read=False).exists():
             report_lines.append("- Restock items with low inventory immediately")
         
-        if latest_dataset and not MLModel.objects.filter(dataset=latest_dataset).exists():
+        if latest_dataset and not MLModel.objects.filter(dataset=latest_dataset.source).exists():
             report_lines.append("- Train a machine learning model on your latest dataset")
         
-        return "\n".join(report_lines)
\ No newline at end of file
+        return "\n".join(report_lines)
+
+    def _period_comparison(self):
+        """Year-over-year sales across every uploaded dataset"""
+        table = BusinessDatasetTable(self.business)
+        comparison = table.year_over_year()
+        if comparison.empty or not comparison['previous'].any():
+            return []
+
+        lines = ["\nYEAR-OVER-YEAR SALES (all uploads):"]
+        current, previous = comparison['current'].sum(), comparison['previous'].sum()
+        lines.append(f"Year to date: {current:g} (previous year: {previous:g})")
+        for product, row in comparison.head(3).iterrows():
+            if row['change'] > 0:
+                lines.append(f"- Top riser: {product} ({row['change']:+g})")
+        for product, row in comparison.tail(3).iloc[::-1].iterrows():
+            if row['change'] < 0:
+                lines.append(f"- Top faller: {product} ({row['change']:+g})")
+        return lines
+
+    def _product_classes(self, df):
+        """ABC/XYZ mix and the A-class products that need restocking first"""
+        classes = ProductClassifier(self.business).classes()
+        if classes.empty:
+            return []
+
+        lines = ["\nPRODUCT CLASSES (ABC/XYZ):"]
+        for label, group in classes.groupby('abc_class'):
+            mix = ", ".join(f"{xyz}: {count}" for xyz, count in group['xyz_class'].value_counts().sort_index().items())
+            lines.append(f"{label}: {len(group)} products, {group['revenue_share'].sum():.0%} of revenue ({mix})")
+
+        if all(col in df.columns for col in ['product_name', 'current_stock', 'min_required']):
+            low_stock = ProductClassifier.annotate(df[df['current_stock'] < df['min_required']], classes)
+            priority = low_stock[low_stock['abc_class'] == 'A']['product_name'].astype(str).unique()
+            if len(priority):
+                lines.append(f"- Restock first (A class): {', '.join(priority[:5])}")
+        return lines
@@ -0,0 +1,170 @@
+from django.core.cache import cache
+from scipy import stats
+import numpy as np
+import pandas as pd
+import os
+
+from .columnar_cache import ColumnarCache
+
+PERIODS = {'month': 12, 'week': 53}
+ARTIFACT = 'seasonality.npz'
+CACHE_TIMEOUT = 60 * 60
+
+class SeasonalityAnalyzer:
+    """Seasonal indices and strength for every product, by month and week of year.
+
+    Daily sales are normalised by each product's mean for that year, so
+    multi-year datasets are not mixed, and days without sales rows count as
+    missing rather than zero. Seasonality is tested with a one-way ANOVA of
+    the normalised daily sales across periods.
+    """
+
+    def __init__(self, products, results):
+        self.products = np.asarray(products)
+        self.results = results
+        self._positions = {product: i for i, product in enumerate(self.products.tolist())}
+
+    @classmethod
+    def for_dataset(cls, dataset):
+        """Seasonality for a dataset, computed once and stored with its column cache"""
+        columnar = ColumnarCache(dataset).ensure()
+        key = f"seasonality:{columnar.key}"
+        analyzer = cache.get(key)
+        if analyzer is not None:
+            return analyzer
+
+        path = os.path.join(columnar.path, ARTIFACT)
+        if os.path.exists(path):
+            analyzer = cls.load(path)
+        else:
+            required = ['date', 'product_name', 'sales_quantity']
+            if all(col in columnar.columns for col in required):
+                analyzer = cls.from_frame(columnar.read(required))
+            else:
+                analyzer = cls([], {})
+            analyzer.save(path)
+
+        cache.set(key, analyzer, CACHE_TIMEOUT)
+        return analyzer
+
+    @classmethod
+    def from_frame(cls, df):
+        dates = pd.to_datetime(df['date'], errors='coerce')
+        quantity = pd.to_numeric(df['sales_quantity'], errors='coerce')
+        valid = dates.notna() & quantity.notna() & df['product_name'].notna()
+        product_codes, products = pd.factorize(df['product_name'][valid].astype(str), sort=True)
+        return cls.compute(products, product_codes, dates[valid].to_numpy(), quantity[valid].to_numpy(dtype=float))
+
+    @classmethod
+    def compute(cls, products, product_codes, dates, quantity):
+        """Vectorised over all products at once from parallel row arrays"""
+        n_products = len(products)
+        if not n_products:
+            return cls(products, {})
+
+        # Collapse to one observation per product and day
+        days = dates.astype('datetime64[D]')
+        day_codes, unique_days = pd.factorize(days, sort=True)
+        cell = product_codes * len(unique_days) + day_codes
+        cells, inverse = np.unique(cell, return_inverse=True)
+        daily = np.bincount(inverse, weights=quantity)
+        product = cells // len(unique_days)
+        day = pd.DatetimeIndex(unique_days[cells % len(unique_days)])
+
+        # Normalise by the product's mean daily sales within the same year
+        year_codes, _ = pd.factorize(day.year, sort=True)
+        group = product * (year_codes.max() + 1) + year_codes
+        group_mean = np.bincount(group, weights=daily) / np.bincount(group)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(group_mean[group] > 0, daily / group_mean[group], np.nan)
+        keep = ~np.isnan(ratio)
+
+        periods = {'month': day.month.to_numpy() - 1, 'week': day.isocalendar().week.to_numpy().astype(int) - 1}
+        results = {}
+        for name, size in PERIODS.items():
+            results[name] = cls._anova(product[keep], periods[name][keep], ratio[keep], n_products, size)
+        return cls(products, results)
+
+    @staticmethod
+    def _anova(product, period, values, n_products, n_periods):
+        flat = product * n_periods + period
+        shape = (n_products, n_periods)
+        count = np.bincount(flat, minlength=n_products * n_periods).reshape(shape).astype(float)
+        total = np.bincount(flat, weights=values, minlength=n_products * n_periods).reshape(shape)
+        squares = np.bincount(flat, weights=values ** 2, minlength=n_products * n_periods).reshape(shape)
+
+        n = count.sum(axis=1)
+        k = (count > 0).sum(axis=1)
+        grand_mean = total.sum(axis=1) / np.maximum(n, 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            index = np.where(count > 0, total / count, np.nan)
+            between = np.nansum(count * (index - grand_mean[:, None]) ** 2, axis=1)
+            within = squares.sum(axis=1) - np.nansum(count * index ** 2, axis=1)
+            f_stat = (between / (k - 1)) / (np.maximum(within, 0) / (n - k))
+            strength = between / (between + np.maximum(within, 0))
+
+        testable = (k > 1) & (n > k)
+        p_value = np.where(testable, stats.f.sf(f_stat, k - 1, n - k), np.nan)
+        # A perfectly regular series has zero within-period variance
+        p_value = np.where(testable & np.isinf(f_stat), 0.0, p_value)
+
+        return {
+            'index': index,
+            'strength': np.where(k > 1, strength, np.nan),
+            'p_value': p_value,
+            'observed_periods': k,
+        }
+
+    def save(self, path):
+        arrays = {'products': self.products.astype(str)}
+        for name, result in self.results.items():
+            for field, values in result.items():
+                arrays[f"{name}__{field}"] = values
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            results = {}
+            for key in data.files:
+                if '__' in key:
+                    name, field = key.split('__', 1)
+                    results.setdefault(name, {})[field] = data[key]
+            return cls(data['products'], results)
+
+    def seasonal_products(self, period='month', alpha=0.05, min_strength=0.3, min_periods=3):
+        """Products with significant seasonality, strongest first"""
+        if period not in self.results:
+            return pd.DataFrame(columns=['product_name', 'peak', 'strength', 'p_value'])
+
+        result = self.results[period]
+        mask = (
+            (result['p_value'] < alpha)
+            & (result['strength'] >= min_strength)
+            & (result['observed_periods'] >= min_periods)
+        )
+        rows = np.flatnonzero(mask)
+        peaks = np.nanargmax(result['index'][rows], axis=1) + 1 if len(rows) else np.array([], dtype=int)
+        return pd.DataFrame({
+            'product_name': self.products[rows],
+            'peak': peaks,
+            'strength': result['strength'][rows],
+            'p_value': result['p_value'][rows],
+        }).sort_values('strength', ascending=False, ignore_index=True)
+
+    def factors(self, product_names, dates, period='month'):
+        """Seasonal multipliers for (product, date) pairs; 1.0 where unknown"""
+        product_names = np.asarray(product_names)
+        positions = np.array([self._positions.get(name, -1) for name in product_names.tolist()], dtype=int)
+        factors = np.ones(len(positions))
+        if period not in self.results or not len(positions):
+            return factors
+
+        dates = pd.DatetimeIndex(pd.to_datetime(dates))
+        slots = dates.month.to_numpy() - 1 if period == 'month' else dates.isocalendar().week.to_numpy().astype(int) - 1
+        known = positions >= 0
+        values = self.results[period]['index'][positions[known], slots[known]]
+        factors[known] = np.where(np.isnan(values), 1.0, values)
+        return factors
@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+import os
+
+from .columnar_cache import ColumnarCache
+from . import workers
+
+CHUNK_ELEMENTS = 2 ** 24
+MAX_HORIZON = 365
+MAX_SCENARIOS = 100000
+
+def simulate(history, counts, stock, horizon, scenarios, seed):
+    """Bootstrap daily demand paths for a block of SKUs.
+
+    history is a (skus, days) matrix of observed daily demand, valid up to
+    counts per row. Returns stock-out probability, fill rate and mean days of
+    cover per SKU. Runs in worker processes, so it only takes arrays.
+    """
+    rng = np.random.default_rng(seed)
+    n_skus = len(stock)
+    stockout = np.zeros(n_skus)
+    fill_rate = np.ones(n_skus)
+    cover = np.full(n_skus, float(horizon))
+    mean_demand = np.zeros(n_skus)
+
+    history = history.astype(np.float32)
+    stock = stock.astype(np.float32)
+    # Common random numbers: SKUs are analysed independently, so one set of
+    # uniforms scaled by each SKU's history length keeps every estimate unbiased
+    uniforms = rng.random((scenarios, horizon), dtype=np.float32)
+    step = max(1, CHUNK_ELEMENTS // (scenarios * horizon))
+    for start in range(0, n_skus, step):
+        rows = np.arange(start, min(start + step, n_skus))
+
+        picks = (uniforms[None, :, :] * counts[rows, None, None].astype(np.float32)).astype(np.int32)
+        demand = history[rows[:, None, None], picks]
+        np.cumsum(demand, axis=2, out=demand)
+
+        on_hand = stock[rows, None]
+        total = demand[:, :, -1]
+        short = demand > on_hand[:, :, None]
+        stocked_out = short[:, :, -1]
+        first_short = np.where(stocked_out, short.argmax(axis=2), horizon)
+
+        served = np.minimum(total, on_hand)
+        expected_total = total.mean(axis=1)
+        stockout[rows] = stocked_out.mean(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fill_rate[rows] = np.where(expected_total > 0, served.mean(axis=1) / expected_total, 1.0)
+        cover[rows] = first_short.mean(axis=1)
+        mean_demand[rows] = expected_total
+
+    return stockout, fill_rate, cover, mean_demand
+
+class StockoutSimulator:
+    """Monte Carlo stock-out simulation per SKU from empirical daily sales"""
+
+    def __init__(self, products, history, counts, stock):
+        self.products = np.asarray(products)
+        self.history = history
+        self.counts = counts
+        self.stock = stock
+
+    @classmethod
+    def for_dataset(cls, dataset):
+        columnar = ColumnarCache(dataset).ensure()
+        required = ['date', 'product_name', 'sales_quantity', 'current_stock']
+        missing = [col for col in required if col not in columnar.columns]
+        if missing:
+            raise ValueError(f"Dataset is missing columns required for simulation: {', '.join(missing)}")
+        return cls.from_frame(columnar.read(required))
+
+    @classmethod
+    def from_frame(cls, df):
+        dates = pd.to_datetime(df['date'], errors='coerce')
+        quantity = pd.to_numeric(df['sales_quantity'], errors='coerce')
+        stock = pd.to_numeric(df['current_stock'], errors='coerce')
+        valid = dates.notna() & quantity.notna() & df['product_name'].notna()
+
+        product_codes, products = pd.factorize(df['product_name'][valid].astype(str), sort=True)
+        days = dates[valid].to_numpy().astype('datetime64[D]')
+        first_day = days.min()
+        day_index = (days - first_day).astype(int)
+        n_days = day_index.max() + 1
+
+        # Daily demand matrix; days without sales rows inside a product's active span count as zero
+        daily = np.bincount(
+            product_codes * n_days + day_index, weights=np.maximum(quantity[valid].to_numpy(dtype=float), 0),
+            minlength=len(products) * n_days
+        ).reshape(len(products), n_days)
+        first_sale = np.full(len(products), n_days)
+        np.minimum.at(first_sale, product_codes, day_index)
+        counts = n_days - first_sale
+        span = np.arange(n_days)[None, :] - first_sale[:, None]
+        history = np.zeros_like(daily)
+        active = span >= 0
+        history[np.nonzero(active)[0], span[active]] = daily[active]
+
+        # Latest stock level recorded for each product
+        latest = pd.DataFrame({'product': product_codes, 'date': days, 'stock': stock[valid].to_numpy(dtype=float)})
+        latest = latest.dropna().sort_values('date', kind='stable').groupby('product')['stock'].last()
+        current_stock = np.zeros(len(products))
+        current_stock[latest.index.to_numpy()] = latest.to_numpy()
+
+        return cls(products, history, counts, current_stock)
+
+    def run(self, horizon=30, scenarios=1000, demand_multiplier=1.0, additional_stock=0,
+            products=None, n_jobs=None, seed=42):
+        """Per-SKU stock-out probability, expected fill rate and days of cover.
+
+        Large runs are sharded by SKU across the worker pool unless n_jobs is given.
+        """
+        horizon, scenarios = int(horizon), int(scenarios)
+        if not 1 <= horizon <= MAX_HORIZON:
+            raise ValueError(f"Horizon must be between 1 and {MAX_HORIZON} days")
+        if not 1 <= scenarios <= MAX_SCENARIOS:
+            raise ValueError(f"Scenarios must be between 1 and {MAX_SCENARIOS}")
+
+        selected = np.arange(len(self.products))
+        if products:
+            selected = np.flatnonzero(np.isin(self.products, list(products)))
+
+        history = self.history[selected] * float(demand_multiplier)
+        counts = self.counts[selected]
+        stock = np.maximum(self.stock[selected] + float(additional_stock), 0)
+
+        if n_jobs is None:
+            large = len(selected) * scenarios * horizon > 4 * CHUNK_ELEMENTS
+            n_jobs = (os.cpu_count() or 1) if large else 1
+        shards = np.array_split(np.arange(len(selected)), max(1, min(int(n_jobs), len(selected))))
+        seeds = np.random.SeedSequence(seed).spawn(len(shards))
+        args = [(history[shard], counts[shard], stock[shard], horizon, scenarios, shard_seed)
+                for shard, shard_seed in zip(shards, seeds)]
+        if len(shards) > 1:
+            futures = [workers.process_pool().submit(simulate, *arg) for arg in args]
+            results = [future.result() for future in futures]
+        else:
+            results = [simulate(*arg) for arg in args]
+
+        stockout, fill_rate, cover, mean_demand = (np.concatenate(parts) for parts in zip(*results))
+        return pd.DataFrame({
+            'product_name': self.products[selected],
+            'current_stock': stock,
+            'mean_demand': mean_demand,
+            'stockout_probability': stockout,
+            'fill_rate': fill_rate,
+            'days_of_cover': cover,
+        }).sort_values('stockout_probability', ascending=False, ignore_index=True)
@@ -0,0 +1,111 @@
+from django.core.cache import cache
+import numpy as np
+import pandas as pd
+
+from .data_processor import DataProcessor
+
+STATUS_LABELS = np.array(['Out of Stock', 'Critical', 'Low', 'OK'])
+CRITICAL_RATIO = 0.5
+SORT_FIELDS = ('severity', 'product_name', 'current_stock', 'min_required', 'shortfall', 'abc_class', 'xyz_class')
+MAX_PAGE_SIZE = 500
+CACHE_TIMEOUT = 60 * 60
+
+class StockStatusAnalyzer:
+    COLUMNS = ['product_name', 'current_stock', 'min_required']
+
+    def __init__(self, df):
+        self.df = df
+
+    @classmethod
+    def for_dataset(cls, dataset, df=None):
+        """Stock status for a dataset, computed once and cached"""
+        key = f"stock_status:{dataset.artifact_key}"
+        status = cache.get(key)
+        if status is None:
+            if df is None:
+                df = DataProcessor(dataset.file.path).load_data(only_preview=True)
+                df.columns = [col.lower() for col in df.columns]
+            status = cls(df).compute()
+            cache.set(key, status, CACHE_TIMEOUT)
+        return status
+
+    @classmethod
+    def has_columns(cls, df):
+        return all(col in df.columns for col in cls.COLUMNS)
+
+    def compute(self):
+        """Vectorized status tiers per product: out of stock, critical, low and OK"""
+        if not self.has_columns(self.df):
+            return pd.DataFrame(columns=self.COLUMNS + ['shortfall', 'severity', 'status'])
+
+        stock = pd.to_numeric(self.df['current_stock'], errors='coerce').to_numpy(dtype=float)
+        required = pd.to_numeric(self.df['min_required'], errors='coerce').to_numpy(dtype=float)
+        names = self.df['product_name']
+        valid = ~(np.isnan(stock) | np.isnan(required) | names.isna().to_numpy())
+
+        status = pd.DataFrame({
+            'product_name': names.to_numpy()[valid].astype(str),
+            'current_stock': stock[valid],
+            'min_required': required[valid],
+        })
+        if 'date' in self.df.columns:
+            # Dated exports repeat each product every day; its latest row holds the current stock
+            status['date'] = pd.to_datetime(self.df['date'], errors='coerce').to_numpy()[valid]
+            status = status.sort_values('date', kind='stable', na_position='first')
+            status = status.drop_duplicates('product_name', keep='last').drop(columns='date')
+
+        stock, required = status['current_stock'].to_numpy(), status['min_required'].to_numpy()
+        severity = np.select(
+            [stock <= 0, stock < required * CRITICAL_RATIO, stock < required],
+            [0, 1, 2],
+            default=3
+        )
+        status['shortfall'] = np.maximum(required - stock, 0)
+        status['severity'] = severity
+        status['status'] = STATUS_LABELS[severity]
+        return status.reset_index(drop=True)
+
+    @staticmethod
+    def summary(status):
+        """Count of products per status tier"""
+        counts = np.bincount(status['severity'].to_numpy(dtype=int), minlength=len(STATUS_LABELS))
+        return dict(zip(STATUS_LABELS.tolist(), counts.tolist()))
+
+    @staticmethod
+    def page(status, sort='severity', order='asc', page=1, page_size=50, status_filter=None,
+             abc_filter=None, xyz_filter=None):
+        """Sorted page of the status table as a column-oriented payload"""
+        if sort not in SORT_FIELDS or sort not in status.columns:
+            raise ValueError(f"Cannot sort by '{sort}'")
+        page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+
+        if status_filter:
+            status = status[status['status'].isin(status_filter)]
+        if abc_filter:
+            status = status[status['abc_class'].isin(abc_filter)]
+        if xyz_filter:
+            status = status[status['xyz_class'].isin(xyz_filter)]
+
+        # Severity ties are broken by the largest shortfall first
+        keys = [status['product_name'].to_numpy(), status[sort].to_numpy()]
+        if sort == 'severity':
+            keys = [status['product_name'].to_numpy(), -status['shortfall'].to_numpy(), status['severity'].to_numpy()]
+        index = np.lexsort(keys)
+        if order == 'desc':
+            index = index[::-1]
+
+        total = len(index)
+        num_pages = max(1, -(-total // page_size))
+        page = max(1, min(int(page), num_pages))
+        rows = status.iloc[index[(page - 1) * page_size:page * page_size]]
+
+        columns = ['product_name', 'current_stock', 'min_required', 'shortfall', 'status']
+        columns += [col for col in ('abc_class', 'xyz_class') if col in status.columns]
+        return {
+            'columns': columns,
+            'data': {col: rows[col].tolist() for col in columns},
+            'page': page,
+            'page_size': page_size,
+            'num_pages': num_pages,
+            'total': total,
+        }
@@ -0,0 +1,31 @@
+from django.core.files.storage import default_storage
+from ..models import Dataset
+import hashlib
+import os
+import tempfile
+
+UPLOAD_TO = 'datasets/'
+
+def store_upload(uploaded_file):
+    """Stream an upload to storage while hashing it; identical content shares one file.
+
+    Returns the stored file name and the SHA-256 of the content.
+    """
+    directory = default_storage.path(UPLOAD_TO)
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha256()
+
+    with tempfile.NamedTemporaryFile(dir=directory, suffix='.part', delete=False) as tmp:
+        for chunk in uploaded_file.chunks():
+            digest.update(chunk)
+            tmp.write(chunk)
+    content_hash = digest.hexdigest()
+
+    existing = Dataset.objects.filter(content_hash=content_hash).exclude(file='').first()
+    if existing is not None and default_storage.exists(existing.file.name):
+        os.remove(tmp.name)
+        return existing.file.name, content_hash
+
+    name = default_storage.get_available_name(UPLOAD_TO + os.path.basename(uploaded_file.name))
+    os.replace(tmp.name, default_storage.path(name))
+    return name, content_hash
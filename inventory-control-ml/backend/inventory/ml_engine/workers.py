@@ -0,0 +1,31 @@
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections
+import os
+import threading
+
+_lock = threading.Lock()
+_pool = None
+
+def process_pool():
+    """Shared process pool for CPU-heavy ML jobs, created on first use"""
+    global _pool
+    with _lock:
+        if _pool is None:
+            max_workers = getattr(settings, 'ML_WORKERS', None) or max(1, (os.cpu_count() or 2) - 1)
+            _pool = ProcessPoolExecutor(max_workers=max_workers)
+        return _pool
+
+def submit(fn, *args, on_done=None):
+    """Run fn in the pool and hand its result (or exception) to on_done in this process"""
+    future = process_pool().submit(fn, *args)
+    if on_done is not None:
+        def callback(done):
+            try:
+                on_done(done)
+            except Exception as e:
+                print(f"Error handling background job result: {str(e)}")
+            finally:
+                close_old_connections()
+        future.add_done_callback(callback)
+    return future
@@ -17,6 +17,18 @@ class Dataset(models.Model):
     uploaded_at = models.DateTimeField(auto_now_add=True)
     columns = models.JSONField(default=list)
     row_count = models.IntegerField(default=0)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    canonical = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='duplicates')
+
+    @property
+    def source(self):
+        """The dataset whose parsed artifacts and models this upload reuses"""
+        return self.canonical or self
+
+    @property
+    def artifact_key(self):
+        """Key for derived artifacts, shared by every upload of identical content"""
+        return self.content_hash or str(self.id)
 
 class MLModel(models.Model):
     dataset = models.ForeignKey(Dataset, on_delete=models.CASCADE)
@@ -26,6 +38,34 @@ class MLModel(models.Model):
     accuracy = models.FloatField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     model_file = models.FileField(upload_to='models/', null=True, blank=True)
+    serving_file = models.FileField(upload_to='models/', null=True, blank=True)
+
+class ModelEvaluation(models.Model):
+    ml_model = models.OneToOneField(MLModel, on_delete=models.CASCADE, related_name='evaluation')
+    metric = models.CharField(max_length=50)
+    cv_strategy = models.CharField(max_length=50)
+    n_splits = models.IntegerField()
+    fold_scores = models.JSONField(default=dict)
+    mean_score = models.FloatField()
+    std_score = models.FloatField()
+    fit_time_ms = models.FloatField()
+    predict_latency_ms = models.FloatField()
+    model_size_bytes = models.BigIntegerField()
+    serving_kind = models.CharField(max_length=50, blank=True)
+    serving_latency_ms = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+class Explanation(models.Model):
+    ml_model = models.ForeignKey(MLModel, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20)
+    input_hash = models.CharField(max_length=64)
+    status = models.CharField(max_length=20, default='pending')
+    values = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('ml_model', 'input_hash')
 
 class Prediction(models.Model):
     ml_model = models.ForeignKey(MLModel, on_delete=models.CASCADE)
@@ -33,12 +73,55 @@ class Prediction(models.Model):
     output_data = models.JSONField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+class ModelDriftState(models.Model):
+    ml_model = models.OneToOneField(MLModel, on_delete=models.CASCADE, related_name='drift_state')
+    baseline = models.JSONField(default=list)
+    baseline_total = models.IntegerField(default=0)
+    window = models.JSONField(default=list)
+    window_total = models.IntegerField(default=0)
+    checks = models.IntegerField(default=0)
+    last_report = models.JSONField(null=True, blank=True)
+    status = models.CharField(max_length=20, default='ready')
+    updated_at = models.DateTimeField(auto_now=True)
+
 class Notification(models.Model):
     business = models.ForeignKey(Business, on_delete=models.CASCADE)
     message = models.TextField()
     notification_type = models.CharField(max_length=50)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    dedup_key = models.CharField(max_length=200, null=True, blank=True)
+
+    class Meta:
+        unique_together = ('business', 'dedup_key')
+        indexes = [models.Index(fields=['business', 'is_read'])]
+
+class ProductSalesState(models.Model):
+    business = models.ForeignKey(Business, on_delete=models.CASCADE)
+    product_name = models.CharField(max_length=200)
+    count = models.IntegerField(default=0)
+    mean = models.FloatField(default=0)
+    m2 = models.FloatField(default=0)
+    ewma = models.FloatField(default=0)
+    ewm_abs_dev = models.FloatField(default=0)
+    last_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('business', 'product_name')
+
+class ProductClass(models.Model):
+    dataset = models.ForeignKey(Dataset, on_delete=models.CASCADE, related_name='product_classes')
+    product_name = models.CharField(max_length=200)
+    revenue = models.FloatField(default=0)
+    quantity = models.FloatField(default=0)
+    weeks = models.IntegerField(default=0)
+    weekly_sumsq = models.FloatField(default=0)
+    abc_class = models.CharField(max_length=1)
+    xyz_class = models.CharField(max_length=1)
+
+    class Meta:
+        unique_together = ('dataset', 'product_name')
 
 class Report(models.Model):
     business = models.ForeignKey(Business, on_delete=models.CASCADE)
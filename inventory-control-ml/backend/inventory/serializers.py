@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Business, Dataset, MLModel, Notification, Report, Prediction
+from .models import Business, Dataset, Explanation, MLModel, ModelDriftState, ModelEvaluation, Notification, ProductClass, ProductSalesState, Report, Prediction
 
 class BusinessSerializer(serializers.ModelSerializer):
     class Meta:
@@ -9,17 +9,40 @@ class BusinessSerializer(serializers.ModelSerializer):
 class DatasetSerializer(serializers.ModelSerializer):
     class Meta:
         model = Dataset
-        fields = ['id', 'business', 'name', 'file', 'uploaded_at', 'columns', 'row_count']
+        fields = ['id', 'business', 'name', 'file', 'uploaded_at', 'columns', 'row_count', 'content_hash', 'canonical']
 
 class MLModelSerializer(serializers.ModelSerializer):
     class Meta:
         model = MLModel
         fields = ['id', 'dataset', 'name', 'model_type', 'algorithm', 'accuracy', 'created_at']
 
+class ModelEvaluationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ModelEvaluation
+        fields = ['id', 'ml_model', 'metric', 'cv_strategy', 'n_splits', 'fold_scores', 'mean_score', 'std_score',
+                  'fit_time_ms', 'predict_latency_ms', 'model_size_bytes', 'serving_kind', 'serving_latency_ms',
+                  'created_at']
+
+class ExplanationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Explanation
+        fields = ['id', 'ml_model', 'kind', 'input_hash', 'status', 'values', 'created_at', 'updated_at']
+
+class ModelDriftStateSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ModelDriftState
+        fields = ['id', 'ml_model', 'baseline_total', 'window_total', 'checks', 'last_report', 'updated_at']
+
 class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
-        fields = ['id', 'business', 'message', 'notification_type', 'is_read', 'created_at']
+        fields = ['id', 'business', 'message', 'notification_type', 'is_read', 'created_at', 'dedup_key']
+
+class ProductClassSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ProductClass
+        fields = ['id', 'dataset', 'product_name', 'revenue', 'quantity', 'weeks', 'weekly_sumsq', 'abc_class',
+                  'xyz_class']
 
 class ReportSerializer(serializers.ModelSerializer):
     class Meta:
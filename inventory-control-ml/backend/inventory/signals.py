@@ -0,0 +1,9 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Notification
+from .ml_engine.notification_feed import NotificationFeed
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def publish_notification(sender, instance, **kwargs):
+    NotificationFeed(instance.business_id).publish()
@@ -3,11 +3,20 @@ from .views import (
     DashboardView,
     DataUploadView,
     InsightsView,
+    InventoryStatusView,
+    ProductClassView,
+    PeriodComparisonView,
+    SimulationView,
     NotificationsView,
+    NotificationStreamView,
+    NotificationFeedView,
     ReportsView,
     CustomLoginView,
     TrainModelView,
-    PredictView
+    PredictView,
+    ExplainView,
+    DriftView,
+    AdmissionMetricsView
 )
 
 urlpatterns = [
@@ -18,7 +27,17 @@ urlpatterns = [
     path('notifications/', NotificationsView.as_view(), name='notifications'),
     path('reports/', ReportsView.as_view(), name='reports'),
     
+    path('api/inventory/status/', InventoryStatusView.as_view(), name='inventory_status'),
+    path('api/inventory/classes/', ProductClassView.as_view(), name='product_classes'),
+    path('api/analytics/compare/', PeriodComparisonView.as_view(), name='period_comparison'),
+    path('api/notifications/stream/', NotificationStreamView.as_view(), name='notification_stream'),
+    path('api/notifications/feed/', NotificationFeedView.as_view(), name='notification_feed'),
+    path('api/admission/metrics/', AdmissionMetricsView.as_view(), name='admission_metrics'),
+    path('api/simulate/', SimulationView.as_view(), name='simulate'),
+
     # ML URLs
     path('api/train/<int:dataset_id>/', TrainModelView.as_view(), name='train_model'),
     path('api/predict/<int:model_id>/', PredictView.as_view(), name='predict'),
+    path('api/explain/<int:model_id>/', ExplainView.as_view(), name='explain'),
+    path('api/drift/<int:model_id>/', DriftView.as_view(), name='model_drift'),
 ]
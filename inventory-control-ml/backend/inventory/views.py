@@ -2,17 +2,28 @@ from django.shortcuts import render, redirect
 from django.views import View
 from django.contrib import messages
 from django.contrib.auth.models import User
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
-from .models import Business, Dataset, MLModel, Notification, Report, Prediction
+from .models import Business, Dataset, MLModel, ModelEvaluation, Notification, Report, Prediction
 from .ml_engine.data_processor import DataProcessor
 from .ml_engine.automl import AutoMLEngine
 from .ml_engine.notifications import NotificationEngine
 from .ml_engine.report_generator import ReportGenerator
+from .ml_engine.stock_status import StockStatusAnalyzer
+from .ml_engine.columnar_cache import ColumnarCache
+from .ml_engine.dataset_table import BusinessDatasetTable
+from .ml_engine.explanations import ExplanationEngine, input_hash
+from .ml_engine.uploads import store_upload
+from .ml_engine.simulation import StockoutSimulator
+from .ml_engine.drift import DriftMonitor
+from .ml_engine.notification_feed import NotificationFeed, PAGE_SIZE
+from .ml_engine.classification import ProductClassifier
+from .ml_engine.admission import admission_control, business_key, metrics as admission_metrics
 from django.contrib.auth.views import LoginView
 from django.urls import reverse_lazy
 import pandas as pd
+import numpy as np
 import json
 from datetime import datetime, timedelta  
 import logging  
@@ -40,6 +51,7 @@ class DashboardView(View):
                 'models_count': models_count,
                 'reports_count': reports_count,
                 'notifications': recent_notifications,
+                'notification_cursor': NotificationFeed(business).latest_id(),
                 'latest_dataset': latest_dataset
             })
             
@@ -56,6 +68,7 @@ class DataUploadView(View):
     def get(self, request):
         return render(request, 'data_upload.html')
     
+    @method_decorator(admission_control('upload'))
     def post(self, request):
         try:
             if 'dataset' not in request.FILES:
@@ -79,10 +92,31 @@ class DataUploadView(View):
             else:
                 business = businesses.latest('created_at')
 
+            file_name, content_hash = store_upload(file)
+            original = Dataset.objects.filter(
+                business=business, content_hash=content_hash, canonical__isnull=True
+            ).order_by('uploaded_at').first()
+            
+            if original:
+                # Identical re-upload: reference the original's artifacts and models instead of reprocessing
+                Dataset.objects.create(
+                    business=business,
+                    name=file.name,
+                    file=file_name,
+                    content_hash=content_hash,
+                    canonical=original,
+                    columns=original.columns,
+                    row_count=original.row_count
+                )
+                messages.info(request, f"File '{file.name}' is identical to '{original.name}' "
+                                       f"uploaded on {original.uploaded_at.date()}; reusing its analysis")
+                return redirect('insights')
+            
             dataset = Dataset.objects.create(
                 business=business,
                 name=file.name,
-                file=file
+                file=file_name,
+                content_hash=content_hash
             )
             
             processor = DataProcessor(dataset.file.path)
@@ -91,9 +125,15 @@ class DataUploadView(View):
             dataset.columns = list(df.columns)
             dataset.row_count = len(df)
             dataset.save()
+            ColumnarCache(dataset).ensure(df)
+            
+            try:
+                ProductClassifier(business).refresh(dataset)
+            except Exception as e:
+                logger.error(f"Product classification error: {e}")
             
             notification_engine = NotificationEngine(business)
-            notification_engine.generate_initial_notifications(df)
+            notification_engine.generate_initial_notifications(df, dataset)
             
             messages.success(request, f"File '{file.name}' uploaded successfully!")
             return redirect('insights')
@@ -122,12 +162,14 @@ class InsightsView(View):
 
             if all(col in df.columns for col in ['date', 'sales_quantity']):
                 try:
-                    df['date'] = pd.to_datetime(df['date'], errors='coerce')
-                    df = df.dropna(subset=['date', 'sales_quantity'])
-                    df['sales_quantity'] = pd.to_numeric(df['sales_quantity'], errors='coerce').fillna(0)
+                    # Cleaned on a copy: stock status is cached per dataset and needs every row
+                    sales = df.copy()
+                    sales['date'] = pd.to_datetime(sales['date'], errors='coerce')
+                    sales = sales.dropna(subset=['date', 'sales_quantity'])
+                    sales['sales_quantity'] = pd.to_numeric(sales['sales_quantity'], errors='coerce').fillna(0)
 
                     cutoff_date = datetime.now() - timedelta(days=90)
-                    recent_sales = df.copy()
+                    recent_sales = sales.copy()
 
                     if not recent_sales.empty:
                         daily_sales = recent_sales.groupby('date')['sales_quantity'].sum().reset_index()
@@ -146,21 +188,15 @@ class InsightsView(View):
             else:
                 context['sales_warning'] = "Dataset missing 'date' or 'sales_quantity' columns"
 
-            inventory_columns = ['product_name', 'current_stock', 'min_required']  
-            if all(col in df.columns for col in inventory_columns):
+            if StockStatusAnalyzer.has_columns(df):
                 try:
-                    inventory_data = df[inventory_columns].copy()
-                    inventory_data = inventory_data.dropna()
-                    
-                    inventory_data['current_stock'] = pd.to_numeric(inventory_data['current_stock'], errors='coerce')
-                    inventory_data['min_required'] = pd.to_numeric(inventory_data['min_required'], errors='coerce')
-                    inventory_data = inventory_data.dropna()
-                    
-                    inventory_data['status'] = inventory_data.apply(
-                        lambda x: 'Low' if x['current_stock'] < x['min_required'] else 'OK', axis=1
-                    )
-                    
-                    context['inventory'] = inventory_data.to_dict('records')
+                    status = StockStatusAnalyzer.for_dataset(latest_dataset, df)
+                    if not status.empty:
+                        context['inventory_summary'] = StockStatusAnalyzer.summary(status)
+                        context['inventory_total'] = len(status)
+                        classes = ProductClassifier(business).classes()
+                        if not classes.empty:
+                            context['class_summary'] = classes['abc_class'].value_counts().sort_index().to_dict()
                 except Exception as e:
                     logger.error(f"Inventory data processing error: {e}")
             else:
@@ -173,17 +209,171 @@ class InsightsView(View):
             messages.error(request, f"Error loading insights: {str(e)}")
             return redirect('dashboard')
         
+@method_decorator(login_required, name='dispatch')
+class InventoryStatusView(View):
+    def get(self, request):
+        try:
+            business = Business.objects.get(user=request.user)
+            latest_dataset = Dataset.objects.filter(business=business).order_by('-uploaded_at').first()
+
+            if not latest_dataset:
+                return JsonResponse({'status': 'error', 'message': "No dataset available"}, status=404)
+
+            status = StockStatusAnalyzer.for_dataset(latest_dataset)
+            status = ProductClassifier.annotate(status, ProductClassifier(business).classes())
+            payload = StockStatusAnalyzer.page(
+                status,
+                sort=request.GET.get('sort', 'severity'),
+                order=request.GET.get('order', 'asc'),
+                page=request.GET.get('page', 1),
+                page_size=request.GET.get('page_size', 50),
+                status_filter=request.GET.getlist('status'),
+                abc_filter=request.GET.getlist('abc'),
+                xyz_filter=request.GET.getlist('xyz')
+            )
+            payload['summary'] = StockStatusAnalyzer.summary(status)
+
+            return JsonResponse({'status': 'success', **payload})
+
+        except Business.DoesNotExist:
+            return JsonResponse({'status': 'error', 'message': "Please create a business first"}, status=404)
+        except Exception as e:
+            return JsonResponse({
+                'status': 'error',
+                'message': str(e)
+            }, status=400)
+
+@method_decorator(login_required, name='dispatch')
+class ProductClassView(View):
+    def get(self, request):
+        try:
+            business = Business.objects.get(user=request.user)
+            classifier = ProductClassifier(business)
+            classes = classifier.classes()
+            
+            abc, xyz = request.GET.getlist('abc'), request.GET.getlist('xyz')
+            if abc or xyz:
+                classes = classes[classes['product_name'].isin(classifier.products(abc, xyz))]
+            sort = request.GET.get('sort', 'revenue')
+            if sort not in classes.columns:
+                raise ValueError(f"Cannot sort by '{sort}'")
+            classes = classes.sort_values(sort, ascending=request.GET.get('order', 'desc') == 'asc', kind='stable')
+            
+            columns = ['product_name', 'abc_class', 'xyz_class', 'product_class', 'revenue', 'revenue_share',
+                       'quantity', 'cv']
+            data = {col: classes[col].tolist() for col in columns}
+            # Products without steady demand have an infinite CV, which JSON cannot carry
+            data['cv'] = [cv if np.isfinite(cv) else None for cv in data['cv']]
+            return JsonResponse({
+                'status': 'success',
+                'columns': columns,
+                'data': data,
+                'summary': classes['product_class'].value_counts().to_dict()
+            })
+            
+        except Business.DoesNotExist:
+            return JsonResponse({'status': 'error', 'message': "Please create a business first"}, status=404)
+        except Exception as e:
+            return JsonResponse({
+                'status': 'error',
+                'message': str(e)
+            }, status=400)
+
+@method_decorator(login_required, name='dispatch')
+class PeriodComparisonView(View):
+    def get(self, request):
+        try:
+            business = Business.objects.get(user=request.user)
+            table = BusinessDatasetTable(business)
+            value = request.GET.get('value', 'sales_quantity')
+            by = request.GET.get('by', 'product_name')
+            products = request.GET.getlist('product') or None
+
+            if 'start' in request.GET:
+                comparison = table.compare_periods(
+                    (request.GET['start'], request.GET.get('end')),
+                    (request.GET.get('compare_start'), request.GET.get('compare_end')),
+                    value, by, products
+                )
+            else:
+                comparison = table.year_over_year(value, by, request.GET.get('as_of'), products)
+
+            comparison = comparison.replace({np.nan: None})
+            return JsonResponse({
+                'status': 'success',
+                'index': [str(key) for key in comparison.index],
+                'data': {col: comparison[col].tolist() for col in comparison.columns}
+            })
+
+        except Business.DoesNotExist:
+            return JsonResponse({'status': 'error', 'message': "Please create a business first"}, status=404)
+        except Exception as e:
+            return JsonResponse({
+                'status': 'error',
+                'message': str(e)
+            }, status=400)
+
+@method_decorator(login_required, name='dispatch')
+class SimulationView(View):
+    @method_decorator(admission_control('simulate'))
+    def post(self, request):
+        try:
+            business = Business.objects.get(user=request.user)
+            latest_dataset = Dataset.objects.filter(business=business).order_by('-uploaded_at').first()
+
+            if not latest_dataset:
+                return JsonResponse({'status': 'error', 'message': "No dataset available"}, status=404)
+
+            products = request.POST.getlist('product') or None
+            abc, xyz = request.POST.getlist('abc'), request.POST.getlist('xyz')
+            if abc or xyz:
+                in_class = ProductClassifier(business).products(abc, xyz)
+                products = [name for name in products if name in in_class] if products else in_class
+                if not products:
+                    raise ValueError("No products in the selected classes")
+            
+            simulator = StockoutSimulator.for_dataset(latest_dataset)
+            results = simulator.run(
+                horizon=request.POST.get('horizon', 30),
+                scenarios=request.POST.get('scenarios', 1000),
+                demand_multiplier=request.POST.get('demand_multiplier', 1.0),
+                additional_stock=request.POST.get('additional_stock', 0),
+                products=products
+            )
+            results = ProductClassifier.annotate(results, ProductClassifier(business).classes())
+
+            return JsonResponse({
+                'status': 'success',
+                'columns': list(results.columns),
+                'data': {col: results[col].tolist() for col in results.columns}
+            })
+
+        except Business.DoesNotExist:
+            return JsonResponse({'status': 'error', 'message': "Please create a business first"}, status=404)
+        except Exception as e:
+            return JsonResponse({
+                'status': 'error',
+                'message': str(e)
+            }, status=400)
+
 @method_decorator(login_required, name='dispatch')
 class NotificationsView(View):
     def get(self, request):
         try:
             business = Business.objects.get(user=request.user)
-            notifications = Notification.objects.filter(business=business).order_by('-created_at')
+            feed = NotificationFeed(business)
+            before = request.GET.get('before')
+            notifications = feed.recent(PAGE_SIZE + 1, int(before) if before and before.isdigit() else None)
+            older_cursor = notifications[PAGE_SIZE - 1].id if len(notifications) > PAGE_SIZE else None
+            notifications = notifications[:PAGE_SIZE]
             
-            Notification.objects.filter(business=business, is_read=False).update(is_read=True)
+            # Only the page shown is marked read, and only when something is unread
+            if notifications:
+                feed.mark_read(notifications[0].id, notifications[-1].id)
             
             return render(request, 'notifications.html', {
-                'notifications': notifications
+                'notifications': notifications,
+                'older_cursor': older_cursor
             })
             
         except Business.DoesNotExist:
@@ -193,6 +383,54 @@ class NotificationsView(View):
             messages.error(request, f"Error loading notifications: {str(e)}")
             return redirect('dashboard')
 
+@method_decorator(login_required, name='dispatch')
+class NotificationStreamView(View):
+    def get(self, request):
+        try:
+            business = Business.objects.get(user=request.user)
+            feed = NotificationFeed(business)
+            cursor = request.headers.get('Last-Event-ID') or request.GET.get('cursor')
+            cursor = int(cursor) if cursor else feed.latest_id()
+            
+            response = StreamingHttpResponse(feed.events(cursor), content_type='text/event-stream')
+            response['Cache-Control'] = 'no-cache'
+            response['X-Accel-Buffering'] = 'no'
+            return response
+            
+        except Business.DoesNotExist:
+            # 204 tells EventSource to stop reconnecting
+            return HttpResponse(status=204)
+        except Exception as e:
+            return JsonResponse({
+                'status': 'error',
+                'message': str(e)
+            }, status=400)
+
+@method_decorator(login_required, name='dispatch')
+class NotificationFeedView(View):
+    def get(self, request):
+        try:
+            business = Business.objects.get(user=request.user)
+            feed = NotificationFeed(business)
+            cursor = request.GET.get('cursor')
+            cursor = int(cursor) if cursor else feed.latest_id()
+            
+            notifications = feed.wait(cursor, float(request.GET.get('wait', 0)))
+            return JsonResponse({
+                'status': 'success',
+                'notifications': [feed.serialize(notification) for notification in notifications],
+                'cursor': notifications[-1].id if notifications else cursor,
+                'unread': feed.unread_count()
+            })
+            
+        except Business.DoesNotExist:
+            return HttpResponse(status=204)
+        except Exception as e:
+            return JsonResponse({
+                'status': 'error',
+                'message': str(e)
+            }, status=400)
+
 @method_decorator(login_required, name='dispatch')
 class ReportsView(View):
     def get(self, request):
@@ -212,6 +450,7 @@ class ReportsView(View):
             messages.error(request, f"Error loading reports: {str(e)}")
             return redirect('dashboard')
     
+    @method_decorator(admission_control('report'))
     def post(self, request):
         try:
             business = Business.objects.get(user=request.user)
@@ -245,9 +484,10 @@ class ReportsView(View):
 
 @method_decorator(login_required, name='dispatch')
 class TrainModelView(View):
+    @method_decorator(admission_control('train'))
     def post(self, request, dataset_id):
         try:
-            dataset = Dataset.objects.get(id=dataset_id, business__user=request.user)
+            dataset = Dataset.objects.get(id=dataset_id, business__user=request.user).source
             
             if MLModel.objects.filter(dataset=dataset).exists():
                 messages.info(request, "Model already exists for this dataset")
@@ -262,16 +502,29 @@ class TrainModelView(View):
                 model_type=results['best_model_type'],
                 algorithm=results['best_algorithm'],
                 accuracy=results['best_accuracy'],
-                model_file=results['model_file']
+                model_file=results['model_file'],
+                serving_file=results['serving_file']
             )
+            ModelEvaluation.objects.create(ml_model=model, **results['evaluation'])
+
+            try:
+                ExplanationEngine(model).global_importance()
+            except Exception as e:
+                logger.error(f"Explanation scheduling error: {e}")
+            
+            try:
+                DriftMonitor(model).start(automl.X_train)
+            except Exception as e:
+                logger.error(f"Drift baseline error: {e}")
             
+            score = f"CV {results['metric']}: {results['best_accuracy']:.2f}"
             Notification.objects.create(
                 business=dataset.business,
-                message=f"New model trained: {model.name} (Accuracy: {results['best_accuracy']:.2f})",
+                message=f"New model trained: {model.name} ({score})",
                 notification_type='model'
             )
             
-            messages.success(request, f"Model trained successfully with accuracy: {results['best_accuracy']:.2f}")
+            messages.success(request, f"Model trained successfully ({score})")
             return redirect('insights')
             
         except Exception as e:
@@ -284,9 +537,10 @@ class PredictView(View):
         try:
             model = MLModel.objects.get(id=model_id, dataset__business__user=request.user)
             input_data = request.POST.dict()
+            explain = input_data.pop('explain', '').lower() in ('1', 'true', 'yes')
             
             automl = AutoMLEngine(model.dataset.file.path)
-            prediction = automl.predict(model.model_file.path, input_data)
+            prediction = automl.predict((model.serving_file or model.model_file).path, input_data)
             
             Prediction.objects.create(
                 ml_model=model,
@@ -294,9 +548,93 @@ class PredictView(View):
                 output_data={'prediction': prediction}
             )
             
-            return JsonResponse({
+            try:
+                DriftMonitor(model).observe([input_data], prediction)
+            except Exception as e:
+                logger.error(f"Drift monitoring error: {e}")
+            
+            response = {
                 'status': 'success',
                 'prediction': prediction
+            }
+            # Explanations are only computed on the request path when asked for
+            if explain:
+                explanations = ExplanationEngine(model).explain([input_data], inline=True)
+                response['explanation'] = next(iter(explanations.values()))
+            
+            return JsonResponse(response)
+            
+        except Exception as e:
+            return JsonResponse({
+                'status': 'error',
+                'message': str(e)
+            }, status=400)
+            
+@method_decorator(login_required, name='dispatch')
+class DriftView(View):
+    def get(self, request, model_id):
+        try:
+            model = MLModel.objects.get(id=model_id, dataset__business__user=request.user)
+            return JsonResponse({
+                'status': 'success',
+                **DriftMonitor(model).report()
+            })
+            
+        except Exception as e:
+            return JsonResponse({
+                'status': 'error',
+                'message': str(e)
+            }, status=400)
+
+@method_decorator(login_required, name='dispatch')
+class ExplainView(View):
+    def get(self, request, model_id):
+        try:
+            model = MLModel.objects.get(id=model_id, dataset__business__user=request.user)
+            explanation = ExplanationEngine(model).global_importance()
+            
+            if explanation.status != 'ready':
+                return JsonResponse({'status': explanation.status}, status=202)
+            return JsonResponse({
+                'status': 'success',
+                'importances': explanation.values
+            })
+            
+        except Exception as e:
+            return JsonResponse({
+                'status': 'error',
+                'message': str(e)
+            }, status=400)
+    
+    @method_decorator(admission_control('explain'))
+    def post(self, request, model_id):
+        try:
+            model = MLModel.objects.get(id=model_id, dataset__business__user=request.user)
+            rows = json.loads(request.body or '{}').get('rows', [])
+            
+            if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                raise ValueError("'rows' must be a list of objects")
+            
+            explanations = ExplanationEngine(model).explain(rows)
+            pending = any(values is None for values in explanations.values())
+            return JsonResponse({
+                'status': 'pending' if pending else 'success',
+                'explanations': [explanations[input_hash(row)] for row in rows]
+            }, status=202 if pending else 200)
+            
+        except Exception as e:
+            return JsonResponse({
+                'status': 'error',
+                'message': str(e)
+            }, status=400)
+            
+@method_decorator(login_required, name='dispatch')
+class AdmissionMetricsView(View):
+    def get(self, request):
+        try:
+            return JsonResponse({
+                'status': 'success',
+                'endpoints': admission_metrics(business_key(request))
             })
             
         except Exception as e: